@@ -5,8 +5,11 @@
 # that both files run side-by-side without errors.
 
 from flask import (
-    Flask, render_template, request, redirect, url_for, abort
+    Flask, render_template, stream_template, request, redirect, url_for, abort,
+    Response, stream_with_context, g
 )
+import click
+from flask.sessions import SecureCookieSessionInterface
 from flask_login import (
     LoginManager, login_user, logout_user,
     login_required, current_user, UserMixin
@@ -14,7 +17,22 @@ from flask_login import (
 from werkzeug.security import check_password_hash, generate_password_hash
 from dataclasses import dataclass
 from functools import wraps
-import os, csv, secrets
+from operator import itemgetter
+from collections import Counter, OrderedDict, defaultdict, deque
+from collections.abc import Mapping
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+import multiprocessing, re, tempfile
+import os, io, csv, json, mmap, secrets, sqlite3, struct, sys, threading, time, zlib
+
+try:                                    # POSIX only – no cross-process locking elsewhere
+    import fcntl
+except ImportError:
+    fcntl = None
 
 # ───────────────────────────── constants ──────────────────────────────
 DATA             = "data"
@@ -23,7 +41,66 @@ TROUBLE_FILE     = os.path.join(DATA, "troubleshoot.txt")
 USERS_CSV        = os.path.join(DATA, "users.csv")
 CARRIERS_FILE    = os.path.join(DATA, "carriers.txt")
 
+# journal tuning (see RowStore)
+JOURNAL_FSYNC_EVERY   = int(os.environ.get("JOURNAL_FSYNC_EVERY", 64))         # records
+JOURNAL_FSYNC_SECONDS = float(os.environ.get("JOURNAL_FSYNC_SECONDS", 1.0))
+JOURNAL_COMPACT_BYTES = int(os.environ.get("JOURNAL_COMPACT_BYTES", 4 << 20))
+
+# storage engine: "files" (journaled text files) or "sqlite"
+STORAGE_ENGINE   = os.environ.get("STORAGE_ENGINE", "files")
+SQLITE_DB        = os.environ.get("SQLITE_DB", os.path.join(DATA, "picklists.db"))
+SQLITE_FEED_KEEP     = int(os.environ.get("SQLITE_FEED_KEEP", 10000))   # transactions in the change feed
+SQLITE_FEED_MAX_ROWS = 1000                # bigger transactions are fed as one reload
+
+# bulk ingestion (/account/<name>/bulk)
+BULK_BATCH_ROWS  = int(os.environ.get("BULK_BATCH_ROWS", 5000))   # rows per store batch
+
+# dismissed alerts (append-only; rewritten without stale entries now and then)
+DISMISSED_FILE          = "dismissed_alerts.txt"
+DISMISSED_COMPACT_EVERY = int(os.environ.get("DISMISSED_COMPACT_EVERY", 500))   # appended lines
+
+# conditional GET (ETag / 304) and the rendered-page cache, per worker
+PAGE_CACHE_BYTES    = int(os.environ.get("PAGE_CACHE_BYTES", 16 << 20))
+PAGE_CACHE_MAX_PAGE = 2 << 20              # bigger pages only get the ETag
+
+# account / troubleshoot tables
+PAGE_ROWS          = int(os.environ.get("PAGE_ROWS", 500))        # default ?limit=
+PAGE_ROWS_MAX      = int(os.environ.get("PAGE_ROWS_MAX", 5000))
+STREAM_CHUNK_BYTES = 16 << 10                                     # streamed page writes
+
+# instrumentation (/metrics) and the opt-in slow-request profiler
+METRICS_TOKEN    = os.environ.get("METRICS_TOKEN", "")    # lets a scraper in without a login
+PROFILE_SLOW_MS  = float(os.environ.get("PROFILE_SLOW_MS", 0))   # 0 = profiler off
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))   # seconds between samples
+PROFILE_DIR      = os.environ.get("PROFILE_DIR", os.path.join(DATA, "profiles"))
+
+# passwords: werkzeug hash method (hashes made with anything else are redone
+# at the user's next login), hashing processes per worker, login throttling
+PASSWORD_HASH      = os.environ.get("PASSWORD_HASH", "scrypt:32768:8:1")   # see bench/passwords.py
+HASH_WORKERS       = int(os.environ.get("HASH_WORKERS", 2))      # 0 = hash in the request thread
+LOGIN_WINDOW       = float(os.environ.get("LOGIN_WINDOW", 300))  # seconds
+LOGIN_MAX_PER_USER = int(os.environ.get("LOGIN_MAX_PER_USER", 5))    # failures per window, 0 = no limit
+LOGIN_MAX_PER_IP   = int(os.environ.get("LOGIN_MAX_PER_IP", 50))     # scanners often share one address
+
+# archive of solved pick-lists (flask archive-rollover)
+ARCHIVE_DIR         = os.environ.get("ARCHIVE_DIR", os.path.join(DATA, "archive"))
+ARCHIVE_AFTER_DAYS  = float(os.environ.get("ARCHIVE_AFTER_DAYS", 30))   # solved for this long
+ARCHIVE_BLOCK_BYTES = 64 << 10                                    # per compressed block
+
+# ASGI serving mode (uvicorn app:asgi_app): threads that run the sync views
+ASGI_THREADS     = int(os.environ.get("ASGI_THREADS", 64))
+
+# live updates (/events)
+SSE_MAX_SECONDS  = int(os.environ.get("SSE_MAX_SECONDS", 300))   # then the browser reconnects
+SSE_PING_SECONDS = 15
+# a stream holds a server thread: past SSE_MAX_STREAMS per worker, clients
+# get a long-poll (SSE_POLL_SECONDS at most) and come back after SSE_POLL_RETRY_MS
+SSE_MAX_STREAMS   = int(os.environ.get("SSE_MAX_STREAMS", 8))    # 0 = long-poll only
+SSE_POLL_SECONDS  = float(os.environ.get("SSE_POLL_SECONDS", 1))
+SSE_POLL_RETRY_MS = int(os.environ.get("SSE_POLL_RETRY_MS", 5000))
+
 PROBLEMS         = ["Missing", "WrongPicked", "TSP", "NoProblem"]
+TROUBLE_PROBLEMS = ("Missing", "WrongPicked", "TSP", "MoreSkid")
 REMARKS          = ["PickerMentioned", "PickerDonotMentioned"]
 
 COLS = [
@@ -34,37 +111,263 @@ COLS = [
 IDX = {k: i for i, k in enumerate(COLS)}
 
 # ──────────────────────────── bootstrap files ─────────────────────────
-os.makedirs(DATA, exist_ok=True)
-for fp, seed in [
-        (CARRIERS_FILE, "Default\nUPS\nFedEx\n"),
-        (SCAN_FILE, ""),
-        (TROUBLE_FILE, ""),
-        # provide a default admin user if users.csv doesn’t exist
-        (USERS_CSV, "username,password_hash,role\nadmin,"
-                    f"{generate_password_hash('password')},admin\n")
-]:
-    if not os.path.exists(fp):
+def _create_once(fp, text):
+    """Write *fp* unless it exists; atomic, the first process to link wins."""
+    tmp = f"{fp}.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    try:
+        os.link(tmp, fp)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+
+_bootstrapped = False
+
+def _bootstrap():
+    """
+    Seed the data files that don't exist yet and set the session key.
+    Runs from create_app() (in the master with ``gunicorn --preload``, so
+    once per deployment) or else before a worker opens its first session;
+    afterwards it's a flag check.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    os.makedirs(DATA, exist_ok=True)
+    for fp, seed in [
+            (CARRIERS_FILE, lambda: "Default\nUPS\nFedEx\n"),
+            (SCAN_FILE, lambda: ""),
+            (TROUBLE_FILE, lambda: ""),
+            # provide a default admin user if users.csv doesn’t exist
+            # (hashing is slow on purpose – only done when it's needed)
+            (USERS_CSV, lambda: "username,password_hash,role\nadmin,"
+                                f"{generate_password_hash('password', PASSWORD_HASH)},admin\n")
+    ]:
+        if not os.path.exists(fp):
+            _create_once(fp, seed())
+    app.secret_key = _secret_key()
+    _bootstrapped = True
+
+# ─────────────────────────── instrumentation ──────────────────────────
+class Metrics:
+    """
+    Counters and timers for /metrics (Prometheus text format), plus the
+    bytes / rows tally of the request running on each thread.  Every
+    worker process keeps its own numbers.
+    """
+
+    def __init__(self, prefix="picklist_"):
+        self.prefix   = prefix
+        self.lock     = threading.Lock()
+        self.counters = defaultdict(float)                 # (name, labels) → total
+        self.timers   = defaultdict(lambda: [0, 0.0])      # (name, labels) → [count, sum]
+        self.local    = threading.local()                  # .tally = [read, written, rows]
+
+    def inc(self, name, n=1, **labels):
+        with self.lock:
+            self.counters[name, tuple(sorted(labels.items()))] += n
+
+    def observe(self, name, value, **labels):
+        with self.lock:
+            t = self.timers[name, tuple(sorted(labels.items()))]
+            t[0] += 1
+            t[1] += value
+
+    def io(self, read=0, written=0, rows=0):
+        """Count file bytes and decoded rows, overall and for this request."""
+        with self.lock:
+            self.counters["bytes_read_total", ()]    += read
+            self.counters["bytes_written_total", ()] += written
+            self.counters["rows_parsed_total", ()]   += rows
+        tally = getattr(self.local, "tally", None)
+        if tally is not None:
+            tally[0] += read
+            tally[1] += written
+            tally[2] += rows
+
+    @contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def timed(self, fn):
+        """Decorator: time every call into helper_seconds{fn=...}."""
+        t     = self.timers["helper_seconds", (("fn", fn.__qualname__),)]
+        lock  = self.lock
+        clock = time.perf_counter               # kept cheap: some helpers run per row
+        @wraps(fn)
+        def inner(*a, **kw):
+            t0 = clock()
+            try:
+                return fn(*a, **kw)
+            finally:
+                dt = clock() - t0
+                with lock:
+                    t[0] += 1
+                    t[1] += dt
+        return inner
+
+    def render(self):
+        def series(name, labels, value):
+            lab = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\")
+                                                      .replace('"', '\\"').replace("\n", "\\n"))
+                           for k, v in labels)
+            return f"{self.prefix}{name}{{{lab}}} {value}" if lab else f"{self.prefix}{name} {value}"
+        with self.lock:
+            counters = sorted(self.counters.items())
+            timers   = sorted((k, list(v)) for k, v in self.timers.items())
+        out, typed = [], set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                out.append(f"# TYPE {self.prefix}{name} counter")
+            out.append(series(name, labels, value))
+        for (name, labels), (count, total) in timers:
+            if name not in typed:
+                typed.add(name)
+                out.append(f"# TYPE {self.prefix}{name} summary")
+            out.append(series(name + "_count", labels, count))
+            out.append(series(name + "_sum", labels, total))
+        return "\n".join(out) + "\n"
+
+METRICS = Metrics()
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler (PROFILE_SLOW_MS > 0).  While a request runs
+    its thread's stack is sampled every PROFILE_INTERVAL seconds; requests
+    slower than the threshold leave a collapsed-stack ``.folded`` file in
+    PROFILE_DIR for flamegraph.pl / speedscope / inferno.
+    """
+
+    def __init__(self):
+        self.lock   = threading.Lock()
+        self.active = {}                   # thread id → Counter of folded stacks
+        self._pid   = None
+
+    def start(self):
+        tid = threading.get_ident()
+        with self.lock:
+            self.active[tid] = Counter()
+            if self._pid != os.getpid():   # one sampler thread per process
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="profiler", daemon=True).start()
+        return tid
+
+    def stop(self, tid):
+        with self.lock:
+            return self.active.pop(tid, None)
+
+    def _run(self):
+        while True:
+            time.sleep(PROFILE_INTERVAL)
+            with self.lock:
+                if not self.active:
+                    continue
+                frames = sys._current_frames()
+                for tid, stacks in self.active.items():
+                    f, stack = frames.get(tid), []
+                    while f is not None:
+                        code = f.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        f = f.f_back
+                    if stack:
+                        stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, stacks, endpoint, ms):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        fp = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}"
+                                       f"-{ms:.0f}ms-{os.getpid()}.folded")
         with open(fp, "w", encoding="utf-8") as fh:
-            fh.write(seed)
+            fh.writelines(f"{s} {n}\n" for s, n in stacks.most_common())
+        return fp
+
+PROFILER = SlowRequestProfiler()
 
 # ─────────────────────────── tiny util helpers ────────────────────────
+@METRICS.timed
 def rl(fp):                     # read list
-    return [] if not os.path.exists(fp) else [
-        l.rstrip("\n") for l in open(fp, encoding="utf-8")
-    ]
-def of(fp, lines):              # overwrite file
-    with open(fp, "w", encoding="utf-8") as fh:
+    if not os.path.exists(fp):
+        return []
+    with open(fp, encoding="utf-8") as fh:
+        METRICS.io(read=os.fstat(fh.fileno()).st_size)
+        return [l.rstrip("\n") for l in fh]
+
+def _lines(data):               # bytes → lines, split as rl() does
+    # only \n, \r\n and \r end a line – str.splitlines() would also break
+    # on \x0b, \x1c, \u2028 … inside a free-text field
+    lines = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+@METRICS.timed
+def of(fp, lines):              # overwrite file (atomically)
+    tmp = fp + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
         fh.write("\n".join(lines) + ("\n" if lines else ""))
+        fh.flush()
+        os.fsync(fh.fileno())
+        METRICS.io(written=os.fstat(fh.fileno()).st_size)
+    os.replace(tmp, fp)
+
+class Row(tuple):
+    """
+    One stored row: an immutable tuple of the COLS fields (plus any extra
+    fields a hand-edited line carried), indexable like the old lists –
+    r[IDX["code"]] – or by name – r.code.  The low-cardinality columns
+    share one string object per distinct value, and tuples need no spare
+    capacity, so a row costs about a third of the memory of a list of
+    fresh strings.  To change one: list(r), edit, then upsert.
+    """
+    __slots__ = ()
+
+for _i, _col in enumerate(COLS):
+    setattr(Row, _col, property(itemgetter(_i)))
+del _i, _col
+
+_INTERNED = {}                  # carrier / user / picker remark / problem / flag values
+                                # (bounded sets – free text such as result is not interned)
+
+def _row(parts):
+    """Row from a sequence of at least len(COLS) fields (COLS order)."""
+    code, carrier, user, remark, comment, location, sku, qty, problem, result, flag, *extra = parts
+    s = _INTERNED.setdefault
+    return Row((code, s(carrier, carrier), s(user, user), s(remark, remark),
+                comment, location, sku, qty, s(problem, problem),
+                result, s(flag, flag), *extra))
 
 def _parse(raw):                # split + right-pad
     parts = raw.split("\t")
-    parts += ["-"] * (len(COLS) - len(parts))
-    return parts
+    if len(parts) < len(COLS):
+        parts += ["-"] * (len(COLS) - len(parts))
+    return _row(parts)
 def _to_line(parts): return "\t".join(parts)
 
 # ───────────────────────── auth boiler-plate ──────────────────────────
+def _secret_key():
+    """One key per deployment, so a session works on every gunicorn worker."""
+    if os.environ.get("SECRET_KEY"):
+        return os.environ["SECRET_KEY"]
+    fp = os.path.join(DATA, ".secret_key")
+    if not os.path.exists(fp):
+        _create_once(fp, secrets.token_hex(16))
+    return open(fp).read().strip()
+
+class _Sessions(SecureCookieSessionInterface):
+    """Flask's cookie sessions, with the key read (and data seeded) on first use."""
+
+    def open_session(self, app, request):
+        _bootstrap()
+        return super().open_session(app, request)
+
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)
+app.session_interface = _Sessions()
 
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
@@ -86,65 +389,1089 @@ class User(UserMixin):
     id:   str   # username
     role: str
 
-def _load_auth_users():
-    with open(USERS_CSV, newline="") as fh:
-        return {r["username"]: r for r in csv.DictReader(fh)}
-AUTH_USERS = _load_auth_users()
+@contextmanager
+def _flocked(lock_fp):
+    """Exclusive flock on *lock_fp* (a no-op where fcntl is missing)."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_fp, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+class Directory:
+    """
+    users.csv and carriers.txt, parsed only when they change.  Every read
+    stats the two files and re-parses one whose (inode, size, mtime)
+    moved, so an account or carrier added by any worker is there on the
+    next request; changes go through here under an flock, are written
+    atomically and refresh the cache at once (write-through).
+    """
+
+    def __init__(self, users_fp, carriers_fp):
+        self.users_fp, self.carriers_fp = users_fp, carriers_fp
+        self.lock      = threading.RLock()
+        self._stamps   = {}
+        self._rows     = []                # users.csv rows (dicts), file order
+        self._by_name  = {}                # username → row (last one wins)
+        self._carriers = []
+
+    @staticmethod
+    def _stamp(fp):
+        try:
+            st = os.stat(fp)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _refresh(self):
+        with self.lock:
+            stamp = self._stamp(self.users_fp)
+            if stamp != self._stamps.get(self.users_fp):
+                rows = []
+                if stamp is not None:
+                    with open(self.users_fp, newline="", encoding="utf-8") as fh:
+                        rows = list(csv.DictReader(fh))
+                self._rows, self._by_name = rows, {r["username"]: r for r in rows}
+                self._stamps[self.users_fp] = stamp
+            stamp = self._stamp(self.carriers_fp)
+            if stamp != self._stamps.get(self.carriers_fp):
+                self._carriers = rl(self.carriers_fp)
+                self._stamps[self.carriers_fp] = stamp
+
+    # ── reads ────────────────────────────────────────────────────────
+    def user(self, name):
+        """users.csv row of *name* (username, password_hash, role) or None."""
+        self._refresh()
+        return self._by_name.get(name)
+
+    def usernames(self):
+        self._refresh()
+        return [r["username"] for r in self._rows]
+
+    def carriers(self):
+        self._refresh()
+        return list(self._carriers)
+
+    def version(self):
+        """(inode, size, mtime) of both files – the same in every worker."""
+        self._refresh()
+        return self._stamps.get(self.users_fp), self._stamps.get(self.carriers_fp)
+
+    # ── write-through ────────────────────────────────────────────────
+    def _write_users(self, rows):
+        out = io.StringIO()
+        w   = csv.writer(out, lineterminator="\n")
+        w.writerow(["username", "password_hash", "role"])
+        w.writerows([r["username"], r["password_hash"], r["role"]] for r in rows)
+        of(self.users_fp, out.getvalue().splitlines())
+        self._refresh()
+
+    def set_password(self, name, old_hash, new_hash):
+        """Swap *name*'s hash, unless it was changed since *old_hash* was read."""
+        with self.lock, _flocked(self.users_fp + ".lock"):
+            self._refresh()
+            rows = [dict(r, password_hash=new_hash)
+                    if r["username"] == name and r["password_hash"] == old_hash else r
+                    for r in self._rows]
+            if rows != self._rows:
+                self._write_users(rows)
+
+    def add_user(self, name, password_hash, role="user"):
+        with self.lock, _flocked(self.users_fp + ".lock"):
+            self._refresh()
+            self._write_users(self._rows + [
+                {"username": name, "password_hash": password_hash, "role": role}])
+
+    def delete_user(self, name):
+        with self.lock, _flocked(self.users_fp + ".lock"):
+            self._refresh()
+            self._write_users([r for r in self._rows if r["username"] != name])
+
+    def add_carrier(self, name):
+        with self.lock, _flocked(self.carriers_fp + ".lock"):
+            self._refresh()
+            of(self.carriers_fp, self._carriers + [name])
+            self._refresh()
+
+    def delete_carrier(self, name):
+        with self.lock, _flocked(self.carriers_fp + ".lock"):
+            self._refresh()
+            of(self.carriers_fp, [c.strip() for c in self._carriers if c.strip() != name])
+            self._refresh()
+
+DIRECTORY = Directory(USERS_CSV, CARRIERS_FILE)
+
+class PasswordHasher:
+    """
+    werkzeug password hashing with the PASSWORD_HASH parameters, run in a
+    small process pool: a burst of logins queues behind HASH_WORKERS cores
+    instead of every request thread burning one.  The pool belongs to the
+    worker process and is started on first use.  Its children come from a
+    forkserver – a fresh single-threaded process, with werkzeug.security
+    imported once – since a fork of the worker, which by then runs request
+    and journal threads, could inherit a lock held mid-call and hang.  (As
+    with any forkserver, a script that logs in through the app needs the
+    ``if __name__ == "__main__":`` guard; HASH_WORKERS=0 hashes in-thread.)
+    """
+
+    def __init__(self, method, workers):
+        self.method, self.workers = method, workers
+        self.lock    = threading.Lock()
+        self._pool   = None
+        self._pid    = None
+        self._prefix = None                # method as werkzeug writes it
+
+    def _run(self, fn, *args):
+        if self.workers <= 0 or "forkserver" not in multiprocessing.get_all_start_methods():
+            return fn(*args)
+        with self.lock:
+            if self._pool is None or self._pid != os.getpid():   # first use / forked worker
+                ctx = multiprocessing.get_context("forkserver")
+                ctx.set_forkserver_preload(["__main__", "werkzeug.security"])
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)
+                self._pid  = os.getpid()
+            pool = self._pool
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:          # a child died: start over next time
+            with self.lock:
+                if self._pool is pool:
+                    self._pool = None
+            return fn(*args)
+
+    def hash(self, password):
+        with METRICS.timer("password_hash_seconds", op="hash"):
+            return self._run(generate_password_hash, password, self.method)
+
+    def check(self, pwhash, password):
+        with METRICS.timer("password_hash_seconds", op="check"):
+            return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if *pwhash* was made with other parameters than PASSWORD_HASH."""
+        if self._prefix is None:           # "scrypt" → "scrypt:32768:8:1" etc.
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._prefix
+
+HASHER = PasswordHasher(PASSWORD_HASH, HASH_WORKERS)
+
+class LoginThrottle:
+    """
+    Failed logins per username and per client address over a sliding
+    window.  Once either is at its limit, /login refuses with 429 before
+    doing any hashing, so password guessing can't tie up the workers.
+    Counts are kept per worker process.
+    """
+
+    def __init__(self, window, per_user, per_ip):
+        self.window = window
+        self.limits = {"user": per_user, "ip": per_ip}
+        self.lock   = threading.Lock()
+        self.fails  = {}                   # (kind, key) → deque of failure times
+
+    def retry_after(self, user, ip):
+        """Seconds until (user, ip) may try again; 0 if it may now."""
+        now, wait = time.monotonic(), 0.0
+        with self.lock:
+            for k in (("user", user), ("ip", ip)):
+                q = self.fails.get(k)
+                if q and len(q) >= self.limits[k[0]] and q[0] > now - self.window:
+                    wait = max(wait, q[0] + self.window - now)
+        return wait
+
+    def failed(self, user, ip):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.fails) > 10000:    # forget addresses / names gone quiet
+                self.fails = {k: q for k, q in self.fails.items()
+                              if q[-1] > now - self.window}
+            for k in (("user", user), ("ip", ip)):
+                if self.limits[k[0]] > 0:
+                    self.fails.setdefault(k, deque(maxlen=self.limits[k[0]])).append(now)
+
+    def succeeded(self, user):
+        with self.lock:
+            self.fails.pop(("user", user), None)
+
+THROTTLE = LoginThrottle(LOGIN_WINDOW, LOGIN_MAX_PER_USER, LOGIN_MAX_PER_IP)
 
 @login_manager.user_loader
 def _load(user_id):
-    row = AUTH_USERS.get(user_id)
+    row = DIRECTORY.user(user_id)
     return User(row["username"], row["role"]) if row else None
 
+# ───────────────────────── in-memory row store ────────────────────────
+class RowStore:
+    """
+    Process-resident copy of a COLS-layout data file, keyed on (code, problem).
+
+    Rows keep file order (dict insertion order) and are indexed by code,
+    user and carrier.  The file itself is a snapshot; every mutation is
+    appended to a write-ahead journal ``<file>.log`` as
+
+        <seq> TAB U TAB <row>              up-sert
+        <seq> TAB D TAB <code>[TAB <problem>]   tombstone
+
+    and fsync'd in batches.  Once the journal passes JOURNAL_COMPACT_BYTES
+    the background thread folds it into a fresh snapshot.  Loading replays
+    every record newer than the snapshot, so the result is exactly what
+    parsing a fully rewritten file would give.
+
+    The journal is also how gunicorn workers see each other's writes:
+    every access first tails records appended by other processes, and
+    writers hold an exclusive flock on ``<file>.lock`` while they catch up
+    and append, so no up-sert is ever lost.
+    """
+
+    def __init__(self, fp):
+        self.fp         = fp
+        self.log_fp     = fp + ".log"
+        self.seq_fp     = fp + ".seq"      # "<seq>\t<crc32>" of the last snapshot
+        self.lock_fp    = fp + ".lock"
+        self.lock       = threading.RLock()
+        self._fh        = None             # journal append handle
+        self._lock_fh   = None             # flock handle (one per process)
+        self._pid       = None
+        self._depth     = 0
+        self.listeners  = []               # fn(old, new) per change; (None, None) = reload
+        self._batch     = None             # journal records held back by batch()
+        self._loaded    = False            # loaded on first access (see locked())
+        self._loading   = False
+        self.pending    = 0
+        STORES.append(self)
+
+    # ── cross-process locking ────────────────────────────────────────
+    @contextmanager
+    def locked(self):
+        """Thread lock + exclusive flock on the store's lock file."""
+        with self.lock:
+            if self._pid != os.getpid():           # never share handles across fork
+                self._fh = self._lock_fh = None
+                self._depth = 0
+                self._pid = os.getpid()
+            if self._depth == 0 and fcntl is not None:
+                if self._lock_fh is None:
+                    self._lock_fh = open(self.lock_fp, "a")
+                fcntl.flock(self._lock_fh, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                if not self._loaded:
+                    self.load()
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_fh, fcntl.LOCK_UN)
+
+    # ── loading ──────────────────────────────────────────────────────
+    @METRICS.timed
+    def load(self):
+        with self.lock:
+            self.rows       = {}                   # (code, problem) → row
+            self.pos        = {}                   # (code, problem) → insertion no.
+            self.by_code    = defaultdict(dict)    # code         → {key: None}
+            self.by_user    = defaultdict(dict)    # user.lower() → {key: None}
+            self.by_carrier = defaultdict(dict)    # carrier      → {key: None}
+            self._n         = 0
+            self.seq        = 0
+            self.pending    = 0                    # records written since last fsync
+            self._journal   = None                 # (inode, header seq) being followed
+            self._off       = 0                    # bytes of it applied
+            self._stamp     = None                 # (inode, size, mtime) at last read
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+            self._loading = True                   # listeners get one reload, not every row
+            try:
+                snap  = open(self.fp, "rb").read() if os.path.exists(self.fp) else b""
+                lines = _lines(snap)
+                for raw in lines:
+                    self._put(_parse(raw))
+                METRICS.io(read=len(snap), rows=len(lines))
+                if os.path.exists(self.seq_fp):
+                    seq, _, crc = open(self.seq_fp).read().strip().partition("\t")
+                    if crc == str(zlib.crc32(snap)):   # sidecar belongs to this snapshot
+                        self.seq = int(seq)
+                self._tail(loading=True)
+            finally:
+                self._loading = False
+            if self._loaded:                       # a reload, not the first load
+                self._notify(None, None)
+            self._loaded = True
+
+    def _tail(self, loading=False):
+        """Apply journal records appended since the last call."""
+        try:
+            fh = open(self.log_fp, "rb")
+        except FileNotFoundError:
+            return
+        with fh:
+            st   = os.fstat(fh.fileno())
+            head = fh.readline()
+            base = int(head[2:]) if head.startswith(b"#\t") and head.endswith(b"\n") else None
+            if (st.st_ino, base) != self._journal:  # new journal (compaction)
+                if not loading and base != self.seq:
+                    return self.load()              # we missed records
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                self._journal, self._off = (st.st_ino, base), 0
+            fh.seek(self._off)
+            data = fh.read()
+            self._stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        good = data.rfind(b"\n") + 1
+        if loading and good < len(data):           # torn tail from a crash
+            with open(self.log_fp, "r+b") as fh:
+                fh.truncate(self._off + good)
+        self._off += good
+        lines = _lines(data[:good])
+        for raw in lines:
+            self._apply(raw)
+        METRICS.io(read=len(data), rows=len(lines))
+
+    def _apply(self, raw):
+        head, _, rest = raw.partition("\t")
+        if head == "#":                            # header: base seq of snapshot
+            self.seq = max(self.seq, int(rest))
+            return
+        if head.isdigit():
+            seq = int(head)
+            if seq <= self.seq:
+                return
+            self.seq = seq
+            head, _, rest = rest.partition("\t")
+        if head == "U":                            # (records without a seq are
+            self._put(_parse(rest))                #  pre-journal change-log lines)
+        elif head == "D":
+            self._drop(*rest.split("\t", 1))
+
+    def sync(self):
+        """Catch up with records other processes appended to the journal."""
+        if not self._loaded:
+            with self.locked():                # loads the store
+                return
+        try:
+            st = os.stat(self.log_fp)
+        except FileNotFoundError:
+            return
+        if (st.st_ino, st.st_size, st.st_mtime_ns) != self._stamp:
+            with self.locked():
+                self._tail()
+
+    # ── index maintenance ────────────────────────────────────────────
+    def _put(self, row):
+        key = (row[IDX["code"]], row[IDX["problem"]])
+        old = self.rows.get(key)
+        if old is None:
+            self.pos[key] = self._n
+            self._n += 1
+        else:
+            self._unindex(key, old)
+        self.rows[key] = row
+        self.by_code[key[0]][key] = None
+        self.by_user[row[IDX["user"]].lower()][key] = None
+        self.by_carrier[row[IDX["carrier"]]][key] = None
+        self._notify(old, row)
+
+    def _unindex(self, key, row):
+        for idx, k in ((self.by_code,    key[0]),
+                       (self.by_user,    row[IDX["user"]].lower()),
+                       (self.by_carrier, row[IDX["carrier"]])):
+            bucket = idx.get(k)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del idx[k]
+
+    def _drop(self, code, problem=None):
+        keys = [(code, problem)] if problem is not None else list(self.by_code.get(code, ()))
+        gone = []
+        for key in keys:
+            row = self.rows.pop(key, None)
+            if row is not None:
+                del self.pos[key]
+                self._unindex(key, row)
+                gone.append(row)
+                self._notify(row, None)
+        return gone
+
+    def _notify(self, old, new):
+        if self._loading:
+            return
+        for fn in self.listeners:
+            fn(old, new)
+
+    # ── journal ──────────────────────────────────────────────────────
+    def _log(self, op, payload):
+        """Append one record; caller holds locked() and has just synced."""
+        self.seq += 1
+        rec = f"{self.seq}\t{op}\t{payload}\n".encode("utf-8")
+        if self._batch is not None:
+            self._batch.append(rec)
+        else:
+            self._write_records([rec])
+
+    def _write_records(self, recs):
+        if self._fh is None:
+            self._fh = open(self.log_fp, "ab")
+            if self._fh.tell() == 0:               # fresh journal: header first
+                self._fh.write(f"#\t{self.seq - len(recs)}\n".encode())
+                self._journal = (os.fstat(self._fh.fileno()).st_ino, self.seq - len(recs))
+            _start_maintenance()
+        data = b"".join(recs)
+        self._fh.write(data)
+        self._fh.flush()
+        METRICS.io(written=len(data))
+        self._off = self._fh.tell()
+        st = os.fstat(self._fh.fileno())
+        self._stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        self.pending += len(recs)
+        if self.pending >= JOURNAL_FSYNC_EVERY:
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Many changes under one lock, journaled with a single write."""
+        with self.locked():
+            if self._batch is not None:            # nested – outer batch writes
+                yield self
+                return
+            self._tail()
+            self._batch = []
+            try:
+                yield self
+            finally:
+                recs, self._batch = self._batch, None
+                if recs:
+                    self._write_records(recs)
+
+    def flush(self):
+        """fsync whatever the journal has buffered."""
+        with self.lock:
+            if self._fh is not None and self.pending:
+                os.fsync(self._fh.fileno())
+                self.pending = 0
+
+    @METRICS.timed
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal."""
+        with self.locked():
+            self._tail()
+            body = "".join(_to_line(r) + "\n" for r in self.rows.values()).encode("utf-8")
+            _write_durable(self.fp + ".tmp", body)
+            METRICS.io(written=len(body))
+            _write_durable(self.seq_fp + ".tmp", f"{self.seq}\t{zlib.crc32(body)}\n".encode())
+            os.replace(self.seq_fp + ".tmp", self.seq_fp)
+            os.replace(self.fp + ".tmp", self.fp)
+            head = f"#\t{self.seq}\n".encode()
+            _write_durable(self.log_fp + ".tmp", head)
+            if self._fh is not None:               # Windows can't replace an open file
+                self._fh.close()
+                self._fh = None
+            os.replace(self.log_fp + ".tmp", self.log_fp)
+            st = os.stat(self.log_fp)
+            self._journal, self._off = (st.st_ino, self.seq), len(head)
+            self._stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+            self.pending = 0
+
+    def journal_size(self):
+        return os.path.getsize(self.log_fp) if os.path.exists(self.log_fp) else 0
+
+    # ── public API ───────────────────────────────────────────────────
+    def get(self, code, problem):
+        self.sync()
+        return self.rows.get((code, problem))
+
+    def all(self):
+        self.sync()
+        with self.lock:
+            return list(self.rows.values())
+
+    def upsert(self, row):
+        """Insert or replace the row with the same (code, problem)."""
+        line = _to_line(row).replace("\r", " ").replace("\n", " ")
+        with self.locked():
+            if self._batch is None:
+                self._tail()
+            self._put(_parse(line))
+            self._log("U", line)
+
+    def delete(self, code, problem=None):
+        """Drop (code, problem), or every row of *code*; returns the dropped rows."""
+        with self.locked():
+            if self._batch is None:
+                self._tail()
+            gone = self._drop(code, problem)
+            if gone:
+                self._log("D", code if problem is None else f"{code}\t{problem}")
+            return gone
+
+    @METRICS.timed
+    def for_user(self, user, carrier=None):
+        """Rows scanned by *user* (case-insensitive), optionally of one carrier."""
+        self.sync()
+        with self.lock:
+            keys = self.by_user.get(user.lower(), {})
+            if carrier is not None:
+                other = self.by_carrier.get(carrier, {})
+                if len(other) < len(keys):
+                    keys, other = other, keys
+                keys = [k for k in keys if k in other]
+            return [self.rows[k] for k in sorted(keys, key=self.pos.__getitem__)]
+
+def _write_durable(fp, data: bytes):
+    with open(fp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+STORES = []
+_maintenance_pid = None
+
+def _start_maintenance():
+    """Start (once per process) the journal fsync / compaction thread."""
+    global _maintenance_pid
+    if _maintenance_pid == os.getpid():
+        return
+    _maintenance_pid = os.getpid()
+
+    def loop():
+        while True:
+            time.sleep(JOURNAL_FSYNC_SECONDS)
+            for st in STORES:
+                try:
+                    st.flush()
+                    if st.journal_size() > JOURNAL_COMPACT_BYTES:
+                        with st.locked():          # another worker may have won
+                            if st.journal_size() > JOURNAL_COMPACT_BYTES:
+                                st.compact()
+                except OSError as e:
+                    app.logger.warning("journal maintenance failed for %s: %s", st.fp, e)
+    threading.Thread(target=loop, name="journal-maintenance", daemon=True).start()
+
+# ───────────────────────── SQLite row store ───────────────────────────
+class SqliteStore:
+    """
+    Same API as RowStore, backed by one table of a SQLite (WAL) database.
+
+    The table mirrors COLS; ``pos`` (the rowid) keeps file order, so an
+    up-sert of an existing (code, problem) keeps its place and a new row
+    goes to the end.  Indexes on (code, problem), user, carrier and flag
+    turn every view into an indexed query.  WAL mode lets any number of
+    gunicorn workers read while one writes.  Every write transaction bumps
+    the table's counter in ``meta``; that is ``seq``.
+
+    Each transaction also appends its changes, as (seq, old row, new row),
+    to the ``changes`` table.  That feed is how workers see each other's
+    writes, as the journal is for RowStore: sync() replays the records past
+    ``seq`` to the listeners, so a foreign write reaches them as row-level
+    changes.  A transaction of more than SQLITE_FEED_MAX_ROWS rows, or a
+    worker that fell behind the last SQLITE_FEED_KEEP transactions, gets a
+    reload instead.
+    """
+
+    def __init__(self, db, table):
+        self.db        = db
+        self.table     = table
+        self.listeners = []
+        self.lock      = threading.RLock()  # held while replaying and while writing
+        self.seq       = None               # database opened on first access (see _conn())
+
+    def _conn(self):
+        con = _sqlite_conn(self.db)
+        if self.seq is None:
+            with self.lock:
+                if self.seq is None:
+                    self._create(con)
+        return con
+
+    def _create(self, con):
+        """Tables and indexes, if missing (plain statements: safe inside a transaction)."""
+        t    = self.table
+        cols = ", ".join(f"{c} TEXT NOT NULL DEFAULT '-'" for c in COLS)
+        for sql in (f"CREATE TABLE IF NOT EXISTS {t} (pos INTEGER PRIMARY KEY, {cols}, UNIQUE (code, problem))",
+                    f"CREATE INDEX IF NOT EXISTS {t}_user    ON {t} (lower(user), pos)",
+                    f"CREATE INDEX IF NOT EXISTS {t}_carrier ON {t} (carrier, pos)",
+                    f"CREATE INDEX IF NOT EXISTS {t}_flag    ON {t} (flag, pos)",
+                    "CREATE TABLE IF NOT EXISTS meta (tbl TEXT PRIMARY KEY, seq INTEGER NOT NULL)",
+                    f"INSERT OR IGNORE INTO meta VALUES ('{t}', 0)",
+                    "CREATE TABLE IF NOT EXISTS changes (tbl TEXT NOT NULL, seq INTEGER NOT NULL,"
+                    " old TEXT, new TEXT)",
+                    "CREATE INDEX IF NOT EXISTS changes_seq ON changes (tbl, seq)"):
+            con.execute(sql)
+        self.seq = self._seq(con)
+
+    def _seq(self, con):
+        return con.execute("SELECT seq FROM meta WHERE tbl = ?", (self.table,)).fetchone()[0]
+
+    @METRICS.timed
+    def _select(self, where="", args=()):
+        sql  = f"SELECT {', '.join(COLS)} FROM {self.table} {where} ORDER BY pos"
+        rows = [_row(r) for r in self._conn().execute(sql, args)]
+        METRICS.io(rows=len(rows))
+        return rows
+
+    @contextmanager
+    def _write(self):
+        """
+        One IMMEDIATE transaction.  Nests, also across stores sharing the
+        database.  A store joining it catches up with the feed first (no one
+        else can write now); at commit each store that changed rows bumps
+        its seq, feeds its changes and only then tells its listeners.
+        """
+        con = self._conn()
+        if con.in_transaction:
+            if self not in con.touched:
+                self._join(con)
+            yield con
+            return
+        con.execute("BEGIN IMMEDIATE")
+        con.touched = {}                           # store → [(old, new)]
+        try:
+            self._join(con)
+            yield con
+            seqs = [(st, st._feed(con, changes)) for st, changes in con.touched.items() if changes]
+            con.execute("COMMIT")
+            for st, seq in seqs:
+                st.seq = seq
+                for old, new in con.touched[st]:
+                    st._notify(old, new)
+        except BaseException:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            raise
+        finally:
+            for st in con.touched:
+                st.lock.release()
+            con.touched = {}
+
+    def _join(self, con):
+        self.lock.acquire()
+        con.touched[self] = []
+        self._catch_up(con)
+
+    def _feed(self, con, changes):
+        """Bump seq and append *changes* to the feed; returns the new seq."""
+        seq = con.execute("UPDATE meta SET seq = seq + 1 WHERE tbl = ? RETURNING seq",
+                          (self.table,)).fetchone()[0]
+        if len(changes) > SQLITE_FEED_MAX_ROWS:
+            changes = [(None, None)]
+        con.executemany("INSERT INTO changes VALUES (?, ?, ?, ?)",
+                        [(self.table, seq, old and _to_line(old), new and _to_line(new))
+                         for old, new in changes])
+        if seq % 1000 == 0:
+            con.execute("DELETE FROM changes WHERE tbl = ? AND seq <= ?",
+                        (self.table, seq - SQLITE_FEED_KEEP))
+        return seq
+
+    def _catch_up(self, con):
+        """Replay the feed past self.seq to the listeners; caller holds the lock."""
+        recs = con.execute("SELECT seq, old, new FROM changes WHERE tbl = ? AND seq > ? ORDER BY rowid",
+                           (self.table, self.seq)).fetchall()
+        if not recs:
+            return
+        gap, self.seq = recs[0][0] != self.seq + 1, recs[-1][0]
+        if gap or any(old is None and new is None for _, old, new in recs):
+            self._notify(None, None)               # fell behind the feed / bulk write
+            return
+        for _, old, new in recs:
+            self._notify(old and _parse(old), new and _parse(new))
+
+    def batch(self):
+        """Many changes in one transaction."""
+        return self._write()
+
+    def _notify(self, old, new):
+        for fn in self.listeners:
+            fn(old, new)
+
+    def get(self, code, problem):
+        rows = self._select("WHERE code = ? AND problem = ?", (code, problem))
+        return rows[0] if rows else None
+
+    def all(self):
+        """
+        Every row, as of ``seq``: the feed is replayed in the same read
+        transaction, so a listener rebuilding from this (TroubleBoard,
+        StatusIndex) continues with exactly the changes that come after.
+        """
+        with self.lock:
+            con = self._conn()
+            if con.in_transaction:
+                self._catch_up(con)
+                return self._select()
+            con.execute("BEGIN")
+            try:
+                self._catch_up(con)
+                return self._select()
+            finally:
+                con.execute("COMMIT")
+
+    def upsert(self, row):
+        """Insert or replace the row with the same (code, problem)."""
+        row = Row(_parse(_to_line(row).replace("\r", " ").replace("\n", " "))[:len(COLS)])
+        with self._write() as con:
+            old = self.get(row[IDX["code"]], row[IDX["problem"]])
+            con.execute(
+                f"INSERT INTO {self.table} ({', '.join(COLS)}) "
+                f"VALUES ({', '.join('?' * len(COLS))}) ON CONFLICT (code, problem) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in COLS if c not in ("code", "problem")),
+                row,
+            )
+            con.touched[self].append((old, row))
+
+    def delete(self, code, problem=None):
+        """Drop (code, problem), or every row of *code*; returns the dropped rows."""
+        where, args = (("WHERE code = ?", (code,)) if problem is None else
+                       ("WHERE code = ? AND problem = ?", (code, problem)))
+        with self._write() as con:
+            gone = self._select(where, args)
+            con.execute(f"DELETE FROM {self.table} {where}", args)
+            con.touched[self].extend((row, None) for row in gone)
+        return gone
+
+    def for_user(self, user, carrier=None):
+        """Rows scanned by *user* (case-insensitive), optionally of one carrier."""
+        if carrier is None:
+            return self._select("WHERE lower(user) = lower(?)", (user,))
+        return self._select("WHERE lower(user) = lower(?) AND carrier = ?", (user, carrier))
+
+    def sync(self):
+        """Replay what other processes wrote since the last call."""
+        with self.lock:
+            self._catch_up(self._conn())
+
+class _SqliteConn(sqlite3.Connection):
+    touched = {}                            # stores written in the open transaction
+
+_sqlite_tls = threading.local()
+
+def _sqlite_conn(db):
+    """This thread's connection to *db*, shared by every store on it."""
+    if getattr(_sqlite_tls, "pid", None) != os.getpid():
+        _sqlite_tls.cons, _sqlite_tls.pid = {}, os.getpid()
+    con = _sqlite_tls.cons.get(db)
+    if con is None:
+        con = sqlite3.connect(db, timeout=30, isolation_level=None, factory=_SqliteConn)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        _sqlite_tls.cons[db] = con
+    return con
+
+def _import_sqlite(db, scan_files, trouble_files):
+    """One-shot copy of the text stores (plus any COLS-layout TSVs) into *db*."""
+    counts = {}
+    for table, fp, extra in (("scanned", SCAN_FILE, scan_files),
+                             ("troubleshoot", TROUBLE_FILE, trouble_files)):
+        dst  = SqliteStore(db, table)
+        rows = RowStore(fp).all() + [_parse(l) for f in extra for l in rl(f) if l]
+        with dst._write():
+            for r in rows:
+                dst.upsert(r)
+        counts[table] = len(rows)
+    return counts
+
+if STORAGE_ENGINE == "sqlite":
+    SCANS    = SqliteStore(SQLITE_DB, "scanned")
+    TROUBLES = SqliteStore(SQLITE_DB, "troubleshoot")
+else:
+    SCANS    = RowStore(SCAN_FILE)
+    TROUBLES = RowStore(TROUBLE_FILE)
+
+@app.cli.command("import-sqlite")
+@click.option("--db", default=SQLITE_DB, show_default=True)
+@click.option("--scan-tsv", multiple=True, help="extra COLS-layout TSV for scanned rows")
+@click.option("--trouble-tsv", multiple=True, help="extra COLS-layout TSV for trouble rows")
+def import_sqlite_cmd(db, scan_tsv, trouble_tsv):
+    """Copy scanned.txt / troubleshoot.txt into the SQLite store."""
+    for table, n in _import_sqlite(db, scan_tsv, trouble_tsv).items():
+        click.echo(f"{table}: {n} rows")
+
 # ───────────────────────── data-layer helpers ─────────────────────────
+def _data_version():
+    """
+    The data version: (scans seq, troubles seq).  Every mutation bumps its
+    store's seq (journal record / SQLite meta row), whichever worker made
+    it, so equal versions mean identical rows.
+    """
+    SCANS.sync()
+    TROUBLES.sync()
+    return SCANS.seq, TROUBLES.seq
+
+@METRICS.timed
 def _find_row(code: str, problem: str):
-    """Return (index, row) where both code and problem match."""
-    for i, raw in enumerate(rl(SCAN_FILE)):
-        r = _parse(raw)
-        if r[IDX["code"]] == code and r[IDX["problem"]] == problem:
-            return i, r
-    return None, None
+    """Return (key, row) where both code and problem match."""
+    row = SCANS.get(code, problem)
+    return ((code, problem), row) if row is not None else (None, None)
 
+@METRICS.timed
 def _save_row(row):
     """Up-sert on (code, problem)."""
-    i, _ = _find_row(row[IDX["code"]], row[IDX["problem"]])
-    rows = rl(SCAN_FILE)
-    if i is None:
-        rows.append(_to_line(row))
-    else:
-        rows[i] = _to_line(row)
-    of(SCAN_FILE, rows)
+    SCANS.upsert(row)
 
+@METRICS.timed
 def _delete_row(code, problem: str | None = None):
     """Delete:  • all rows with code  -or-  • only (code,problem)."""
-    keep = []
-    for raw in rl(SCAN_FILE):
-        r = _parse(raw)
-        if problem is None:
-            if r[IDX["code"]] != code:
-                keep.append(raw)
-        else:
-            if not (r[IDX["code"]] == code and r[IDX["problem"]] == problem):
-                keep.append(raw)
-    of(SCAN_FILE, keep)
+    SCANS.delete(code, problem)
 
+@METRICS.timed
 def _sync_trouble(row):
-    """Mirror SCAN_FILE → TROUBLE_FILE."""
-    trows = [_parse(l) for l in rl(TROUBLE_FILE)]
-    trows = [
-        r for r in trows
-        if not (
-            r[IDX["code"]] == row[IDX["code"]] and
-            r[IDX["problem"]] == row[IDX["problem"]]
-        )
-    ]
-
-    if row[IDX["problem"]] in ("Missing", "WrongPicked", "TSP", "MoreSkid"):
+    """Mirror SCAN_FILE → TROUBLE_FILE (the row moves to the end of its block)."""
+    TROUBLES.delete(row[IDX["code"]], row[IDX["problem"]])
+    if row[IDX["problem"]] in TROUBLE_PROBLEMS:
+        row = list(row)
         row[IDX["result"]] = "-"
         row[IDX["flag"]]   = "⚠"
-        trows.append(row)
+        TROUBLES.upsert(row)
+
+@METRICS.timed
+def _apply_entry(f, user):
+    """
+    Validate and perform one add/update entry of the account form.
+    *f* is the form (or a dict with the same field names); returns the
+    error message, or "" once the change is made.
+    """
+    get           = lambda k, d: str(f.get(k) if f.get(k) is not None else d)
+    code          = get("picklist", "").strip().upper()
+    problem       = get("problem", "-")
+    with_problem  = get("with_problem", "-")      # only sent when Problem = NoProblem
+    carrier_val   = get("carrier", "-")
+    picker_remark = get("picker_remark", "-")
+    qty           = get("item_qty", "").strip()
+    comment       = get("comment",  "-").strip() or "-"
+    location      = get("location", "-").strip() or "-"
+    sku           = get("sku",      "-").strip() or "-"
+
+    # ── validation ───────────────────────────────────────────
+    # rows are stored tab-separated: a tab would shift every later column
+    if any("\t" in v for v in (user, problem, with_problem, carrier_val, picker_remark,
+                                comment, location, sku)):
+        return "❌ Fields can't contain tab characters."
+    if problem == "NoProblem":
+        if len(code) != 13 or not code.isalnum():
+            return "❌ Pick-list must be exactly 13 letters/numbers."
+        elif with_problem in ("-", "NoProblem"):
+            return "❌ Choose a value in the “With” box."
+    else:
+        if len(code) != 13 or not code.isalnum():
+            return "❌ Pick-list must be exactly 13 letters/numbers."
+        elif carrier_val in ("-", "Default"):
+            return "❌ Choose a carrier."
+        elif problem == "-":
+            return "❌ Choose Missing / WrongPicked / TSP / MoreSkid / NoProblem."
+        elif picker_remark == "-":
+            return "❌ Select PickerMentioned or PickerDonotMentioned."
+        elif not qty.isdigit() or int(qty) <= 0:
+            return "❌ Item quantity must be a positive number."
+
+    # ── perform the change ──────────────────────────────────
+    if problem == "NoProblem":
+        # user asked to remove an existing “trouble” line
+        _delete_row(code, with_problem)          # delete that single pair
+        _purge_trouble(code, with_problem)
+    else:
+        row                       = ["-"] * len(COLS)
+        row[IDX["code"]]          = code
+        row[IDX["carrier"]]       = carrier_val
+        row[IDX["user"]]          = user
+        row[IDX["picker_remark"]] = picker_remark
+        row[IDX["comment"]]       = comment
+        row[IDX["location"]]      = location
+        row[IDX["sku"]]           = sku
+        row[IDX["item_qty"]]      = qty if qty else "-"
+        row[IDX["problem"]]       = problem
+        _save_row(row)                                # up-sert
+        _sync_trouble(row)                            # mirror to dashboard
+    return ""
+
+# ─────────────────────── paging / streamed pages ──────────────────────
+def _page_opts():
+    """Sort column, direction, limit, offset and cursor from the query string."""
+    sort = request.args.get("sort", "")
+    col  = sort.lstrip("-")
+    if col not in IDX:
+        sort = col = ""
+    try:
+        limit = min(max(int(request.args.get("limit", PAGE_ROWS)), 1), PAGE_ROWS_MAX)
+    except ValueError:
+        limit = PAGE_ROWS
+    try:
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        offset = 0
+    return {"sort": sort, "col": col, "desc": sort.startswith("-"),
+            "limit": limit, "offset": offset, "after": request.args.get("after", "")}
+
+def _sort_value(col):
+    if col == "item_qty":                      # numbers first, numerically
+        return lambda r: (0, int(r[IDX[col]]), "") if r[IDX[col]].isdigit() else (1, 0, r[IDX[col]])
+    return lambda r: r[IDX[col]].lower()
+
+@METRICS.timed
+def _paginate(items, opts, row=lambda it: it):
+    """
+    Sort *items* (file order unless ?sort=) and cut one page out of them.
+    ``?after=CODE||PROBLEM`` continues after that row; if it has gone
+    since, ``?offset=`` is used.  Returns (page, start, has_more).
+    """
+    if opts["col"]:
+        key   = _sort_value(opts["col"])
+        items = sorted(items, key=lambda it: key(row(it)), reverse=opts["desc"])
+    start = opts["offset"]
+    if opts["after"]:
+        code, _, problem = opts["after"].partition("||")
+        for i, it in enumerate(items):
+            r = row(it)
+            if r[IDX["code"]] == code and r[IDX["problem"]] == problem:
+                start = i + 1
+                break
+    page = items[start:start + opts["limit"]]
+    return page, start, start + len(page) < len(items)
+
+def _pager(opts, start, count, total, more, cursor=None):
+    """Counts and prev/next/sort links for the page templates."""
+    def link(**changes):
+        args = {**request.args.to_dict(), **changes}
+        # keys url_for() would take as its own (endpoint, _external …) or
+        # as the view's arguments can't be passed along
+        args = {k: v for k, v in args.items() if v not in ("", None)
+                and k != "endpoint" and not k.startswith("_") and k not in request.view_args}
+        return url_for(request.endpoint, **request.view_args, **args)
+    nxt = start + opts["limit"]
+    return {
+        "first": start + 1 if count else 0, "last": start + count, "total": total,
+        "prev": link(offset=max(start - opts["limit"], 0) or None, after=None) if start else None,
+        "next": link(offset=nxt, after=cursor) if more else None,
+        "sort": {c: link(sort="-" + c if opts["sort"] == c else c, offset=None, after=None)
+                 for c in COLS},
+        "paged": bool(start or more or opts["sort"] or request.args.get("problem")),
+    }
+
+def _streamed(template, **context):
+    """
+    stream_template, re-chunked to STREAM_CHUNK_BYTES so the head of the
+    page goes out before the long tables are rendered, without one write
+    per template statement.
+    """
+    parts = iter(stream_template(template, **context))
+    def chunks():
+        buf, size, spent = [], 0, 0.0
+        while True:
+            t0    = time.perf_counter()        # render time only, not client waits
+            part  = next(parts, None)
+            spent += time.perf_counter() - t0
+            if part is None:
+                break
+            buf.append(part)
+            size += len(part)
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buf)
+                buf, size = [], 0
+        METRICS.observe("render_seconds", spent, template=template)
+        yield "".join(buf)
+    return Response(chunks(), mimetype="text/html")
+
+def _render(template, **context):
+    """render_template, timed into render_seconds{template=...}."""
+    with METRICS.timer("render_seconds", template=template):
+        return render_template(template, **context)
+
+# ─────────────────── conditional GET / page cache ─────────────────────
+def _build_stamp():
+    """Changes with app.py or any template, so a deploy retires old ETags."""
+    tpl   = os.path.join(app.root_path, app.template_folder)
+    files = [__file__] + sorted(os.path.join(tpl, f) for f in os.listdir(tpl))
+    return format(zlib.crc32(repr([(f, os.stat(f).st_mtime_ns) for f in files]).encode()), "08x")
+
+class PageCache:
+    """
+    Last rendered body of each page (endpoint + path + query), tagged with
+    the data version it was rendered at; LRU within PAGE_CACHE_BYTES.  A
+    newer version replaces the page's entry instead of adding one.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.lock   = threading.Lock()
+        self.pages  = OrderedDict()        # page → (version, body)
+        self.size   = 0
 
-    of(TROUBLE_FILE, [_to_line(r) for r in trows])
+    def get(self, page, version):
+        with self.lock:
+            hit = self.pages.get(page)
+            if hit is None or hit[0] != version:
+                return None
+            self.pages.move_to_end(page)
+            return hit[1]
+
+    def put(self, page, version, body):
+        with self.lock:
+            old = self.pages.pop(page, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self.pages[page] = (version, body)
+            self.size += len(body)
+            while self.size > self.budget and self.pages:
+                self.size -= len(self.pages.popitem(last=False)[1][1])
+
+PAGES = PageCache(PAGE_CACHE_BYTES)
+_BUILD = _build_stamp()
+
+def cached_page(view):
+    """
+    ETag = build + data version + request; If-None-Match hits get a 304,
+    other repeats the body cached for this version.  The pages don't
+    depend on who is asking, so the decorator goes below the auth checks.
+    """
+    @wraps(view)
+    def inner(*a, **kw):
+        if request.method not in ("GET", "HEAD"):
+            return view(*a, **kw)
+        page    = (request.endpoint, request.path, tuple(sorted(request.args.items(multi=True))))
+        version = (_data_version(), DIRECTORY.version())
+        etag    = f"{_BUILD}-{zlib.crc32(repr((page, version)).encode()):08x}"
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+        if etag in request.if_none_match:
+            METRICS.inc("page_cache_total", result="not_modified")
+            return Response(status=304, headers=headers)
+        body = PAGES.get(page, version)
+        if body is not None:
+            METRICS.inc("page_cache_total", result="hit")
+            return Response(body, mimetype="text/html", headers=headers)
+        METRICS.inc("page_cache_total", result="miss")
+        resp = app.make_response(view(*a, **kw))
+        if resp.status_code != 200:
+            return resp
+        resp.headers.update(headers)
+        if not resp.is_streamed:
+            if resp.content_length <= PAGE_CACHE_MAX_PAGE:
+                PAGES.put(page, version, resp.get_data())
+            return resp
+        parts = resp.response
+        def tee():                         # cache a streamed page once it has gone out whole
+            kept, size = [], 0
+            try:
+                for part in parts:
+                    if kept is not None:
+                        b     = part.encode("utf-8") if isinstance(part, str) else part
+                        size += len(b)
+                        kept  = kept if size <= PAGE_CACHE_MAX_PAGE else None
+                        if kept is not None:
+                            kept.append(b)
+                    yield part
+            finally:
+                if hasattr(parts, "close"):
+                    parts.close()
+            if kept is not None:
+                PAGES.put(page, version, b"".join(kept))
+        resp.response = tee()
+        return resp
+    return inner
 
 # ───────────────────────────── routes ────────────────────────────────
 @app.route("/")
@@ -153,7 +1480,7 @@ def root(): return redirect(url_for("main_page"))
 @app.route("/main")
 @login_required
 def main_page():
-    return render_template("main.html")
+    return _render("main.html")
 
 # ───────────────────────── account page ──────────────────────────────
 # ───────────────────────── account page ──────────────────────────────
@@ -163,10 +1490,11 @@ def main_page():
 # ------------------------------------------------------------------
 @app.route("/account/<name>", methods=["GET", "POST"])
 @login_required
+@cached_page
 def account(name):
     user             = name.capitalize()
-    users            = [r["username"] for r in csv.DictReader(open(USERS_CSV, newline=""))]
-    carriers         = rl(CARRIERS_FILE) or ["Default"]
+    users            = DIRECTORY.usernames()
+    carriers         = DIRECTORY.carriers() or ["Default"]
     selected_carrier = request.args.get("carrier", "Default")
     msg              = ""
 
@@ -179,71 +1507,23 @@ def account(name):
         #
         picked = set(request.form.getlist("delete_items"))
         if picked:
-            keep_lines = []
-            for raw in rl(SCAN_FILE):
-                r       = _parse(raw)
-                row_id  = f"{r[IDX['code']]}||{r[IDX['problem']]}"
-                if row_id not in picked:
-                    keep_lines.append(raw)
-                else:
-                    _purge_trouble(r[IDX['code']], r[IDX['problem']])       # also clear dashboard
-            of(SCAN_FILE, keep_lines)
+            with SCANS.batch(), TROUBLES.batch():                     # scan + dashboard together
+                for row_id in picked:
+                    code, _, problem = row_id.partition("||")
+                    if SCANS.delete(code, problem):
+                        _purge_trouble(code, problem)                 # also clear dashboard
             return redirect(url_for("account", name=name, carrier=selected_carrier))
 
         # 2. ADD / UPDATE a single row  ---------------------------
-        code          = request.form.get("picklist", "").strip().upper()
-        problem       = request.form.get("problem", "-")
-        with_problem  = request.form.get("with_problem", "-")      # only sent when Problem = NoProblem
-        carrier_val   = request.form.get("carrier", "-")
-        picker_remark = request.form.get("picker_remark", "-")
-        qty           = request.form.get("item_qty", "").strip()
-
-        # ── validation ───────────────────────────────────────────
-        if problem == "NoProblem":
-            if len(code) != 13 or not code.isalnum():
-                msg = "❌ Pick-list must be exactly 13 letters/numbers."
-            elif with_problem in ("-", "NoProblem"):
-                msg = "❌ Choose a value in the “With” box."
-        else:
-            if len(code) != 13 or not code.isalnum():
-                msg = "❌ Pick-list must be exactly 13 letters/numbers."
-            elif carrier_val in ("-", "Default"):
-                msg = "❌ Choose a carrier."
-            elif problem == "-":
-                msg = "❌ Choose Missing / WrongPicked / TSP / MoreSkid / NoProblem."
-            elif picker_remark == "-":
-                msg = "❌ Select PickerMentioned or PickerDonotMentioned."
-            elif not qty.isdigit() or int(qty) <= 0:
-                msg = "❌ Item quantity must be a positive number."
-
-        # ── perform the change ──────────────────────────────────
+        with SCANS.batch(), TROUBLES.batch():                         # scan + dashboard together
+            msg = _apply_entry(request.form, user)
         if not msg:
-            if problem == "NoProblem":
-                # user asked to remove an existing “trouble” line
-                _delete_row(code, with_problem)          # delete that single pair
-                _purge_trouble(code,with_problem)
-            else:
-                row                       = ["-"] * len(COLS)
-                row[IDX["code"]]          = code
-                row[IDX["carrier"]]       = carrier_val
-                row[IDX["user"]]          = user
-                row[IDX["picker_remark"]] = picker_remark
-                row[IDX["comment"]]       = request.form.get("comment",  "-").strip() or "-"
-                row[IDX["location"]]      = request.form.get("location", "-").strip() or "-"
-                row[IDX["sku"]]           = request.form.get("sku",      "-").strip() or "-"
-                row[IDX["item_qty"]]      = qty if qty else "-"
-                row[IDX["problem"]]       = problem
-                _save_row(row)                                # up-sert
-                _sync_trouble(row)                            # mirror to dashboard
             return redirect(url_for("account", name=name, carrier=selected_carrier))
 
     # ─────────────────────────── GET (build page) ─────────────────
-    history = [
-        r for r in map(_parse, rl(SCAN_FILE))
-        if r[IDX["user"]].lower() == user.lower()
-    ]
-    if selected_carrier != "Default":
-        history = [r for r in history if r[IDX["carrier"]] == selected_carrier]
+    history = SCANS.for_user(
+        user, None if selected_carrier == "Default" else selected_carrier
+    )
 
     # coloured suffix tags  (M2,W1…)
     bucket_map = {p: [] for p in ("Missing", "WrongPicked", "TSP", "MoreSkid")}
@@ -251,7 +1531,7 @@ def account(name):
         pb = r[IDX["problem"]]
         if pb in bucket_map:
             bucket_map[pb].append(r)
-    tags = _overlap_tags(bucket_map)
+    tags = OverlapTags(bucket_map)
 
     # pop-ups for own MoreSkid rows
     more_skid_picklists = [
@@ -260,11 +1540,21 @@ def account(name):
         if r[IDX["problem"]] == "MoreSkid" and r[IDX["user"]].lower() == user.lower()
     ]
 
+    # one page of the table (?problem= ?sort= ?limit= ?after= / ?offset=)
+    opts    = _page_opts()
+    problem = request.args.get("problem", "")
+    shown   = [r for r in history if r[IDX["problem"]] == problem] if problem else history
+    rows, start, more = _paginate(shown, opts)
+    cursor  = f"{rows[-1][IDX['code']]}||{rows[-1][IDX['problem']]}" if rows else None
+    pager   = _pager(opts, start, len(rows), len(shown), more, cursor)
+
     # ─────────────────────────── render ───────────────────────────
-    return render_template(
+    return _streamed(
         "account.html",
         name               = user,
-        rows               = history,
+        rows               = rows,
+        pager              = pager,
+        problem_filter     = problem,
         message            = msg,
         users              = users,
         carriers           = carriers,
@@ -275,18 +1565,82 @@ def account(name):
         more_skid_picklists= more_skid_picklists,
         IDX                = IDX
     )
+# ------------------------------------------------------------------
+#  Bulk ingestion  /account/<name>/bulk
+# ------------------------------------------------------------------
+def _bulk_entries():
+    """Yield (line no., fields or error) from the request body without buffering it."""
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")   # werkzeug spools big files to disk
+        if upload is None:
+            return
+        raw, kind, fname = upload.stream, upload.mimetype, upload.filename or ""
+    else:
+        raw, kind, fname = request.stream, request.mimetype, ""
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+    if "json" in kind or fname.endswith((".jsonl", ".ndjson")):
+        for n, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                f = json.loads(line)
+            except ValueError as e:
+                yield n, f"❌ Bad JSON: {e}"
+                continue
+            yield n, f if isinstance(f, dict) else "❌ Expected a JSON object."
+    else:
+        tab = "tab-separated" in kind or fname.endswith(".tsv")
+        for n, f in enumerate(csv.DictReader(text, delimiter="\t" if tab else ","), start=2):
+            yield n, f
+
+@app.post("/account/<name>/bulk")
+@login_required
+def account_bulk(name):
+    """
+    Bulk add/update for handheld scanners and end-of-shift uploads.
+
+    The body is JSON lines (one object per entry) or CSV/TSV with a header
+    row, raw or as the ``file`` field of a multipart upload; field names
+    are those of the account form (picklist, problem, with_problem,
+    carrier, picker_remark, item_qty, comment, location, sku).  Each entry
+    gets the same validation as the form.  Entries are applied in batches
+    of BULK_BATCH_ROWS, each one lock and one journal write per store.
+    Answers with one JSON line per entry.
+    """
+    user    = name.capitalize()
+    results = []
+    pending = []
+
+    def apply():
+        with SCANS.batch(), TROUBLES.batch():
+            for n, f in pending:
+                err = _apply_entry(f, user)
+                results.append({"line": n, "picklist": str(f.get("picklist") or "").strip().upper(),
+                                "ok": not err, "error": err or None})
+        pending.clear()
+
+    for n, entry in _bulk_entries():
+        if isinstance(entry, str):
+            results.append({"line": n, "picklist": None, "ok": False, "error": entry})
+            continue
+        pending.append((n, entry))
+        if len(pending) >= BULK_BATCH_ROWS:
+            apply()
+    if pending:
+        apply()
+    results.sort(key=lambda r: r["line"])
+
+    return Response((json.dumps(r) + "\n" for r in results), mimetype="application/x-ndjson")
+
 ## ──────────────────── TROUBLE-DASHBOARD HELPERS ─────────────────────
 
 def _initial(p):
     return {"Missing": "M", "WrongPicked": "W", "TSP": "T", "MoreSkid": "S"}.get(p, "?")
 
+@METRICS.timed
 def _bucket_rows():
-    buckets = {p: [] for p in ("Missing", "WrongPicked", "TSP", "MoreSkid")}
-    for r in [_parse(l) for l in rl(TROUBLE_FILE)]:
-        pb = r[IDX["problem"]]
-        if pb in buckets:
-            buckets[pb].append(r)
-    return buckets
+    return BOARD.view()[0]
 # ─── NEW helper — decide status of a pick-list across all blocks ──────
 def _picklist_status(rows_for_code: list[list[str]]) -> tuple[str, str]:
     """
@@ -318,6 +1672,7 @@ def _picklist_status(rows_for_code: list[list[str]]) -> tuple[str, str]:
         return "todo", "Partially Solved"  # Green with others
 
     return "todo", "Progress"  # fallback
+@METRICS.timed
 def _overlap_tags(buckets):
     from collections import defaultdict
 
@@ -343,14 +1698,274 @@ def _overlap_tags(buckets):
 
     return tag_result
 
+class OverlapTags(Mapping):
+    """
+    _overlap_tags kept incrementally, as a (code, problem) → tag mapping.
+    Each block is a sorted list of ever-increasing stamps (a new row goes
+    to the end), a row's SN is its stamp's rank, and by_code is the
+    code → {problem: stamp} index.  Tags are formatted from that index
+    when looked up, so a change only touches its own code, and deleting a
+    row shifts the later SNs of its block without rewriting anything.
+    A code appears at most once per block, as in the dashboard.
+    """
+
+    def __init__(self, buckets=None):
+        self.stamps  = {}                   # problem → live stamps, block order
+        self.by_code = defaultdict(dict)    # code → {problem: stamp}
+        self._next   = 0
+        for pb, rows in (buckets or {}).items():
+            self.stamps.setdefault(pb, [])
+            for r in rows:
+                self.add(r[IDX["code"]], pb)
+
+    def add(self, code, problem):
+        """Row (code, problem) at the end of its block; no-op if already there."""
+        mine = self.by_code[code]
+        if problem not in mine:
+            mine[problem] = self._next
+            self.stamps.setdefault(problem, []).append(self._next)
+            self._next += 1
+
+    def remove(self, code, problem):
+        mine  = self.by_code.get(code, {})
+        stamp = mine.pop(problem, None)
+        if stamp is None:
+            return
+        block = self.stamps[problem]
+        del block[bisect_left(block, stamp)]
+        if not mine:
+            del self.by_code[code]
+
+    def __getitem__(self, key):
+        code, problem = key
+        mine = self.by_code.get(code)
+        if not mine or problem not in mine:
+            raise KeyError(key)
+        other = [f"{_initial(pb)}{bisect_left(block, mine[pb]) + 1}"
+                 for pb, block in self.stamps.items() if pb != problem and pb in mine]
+        return f"({','.join(other)})" if other else ""
+
+    def __iter__(self):
+        for code, mine in self.by_code.items():
+            for pb in mine:
+                yield code, pb
+
+    def __len__(self):
+        return sum(map(len, self.stamps.values()))
+
+@METRICS.timed
 def _alert_rows():
     """Return list of dicts for rows needing attention popup."""
-    lst = []
-    for bucket, rows in _bucket_rows().items():
-        for r in rows:
-            if r[IDX["picker_remark"]] == "PickerDonotMentioned" and r[IDX["flag"]] != "✅":
-                lst.append({"code": r[IDX["code"]], "bucket": bucket})
-    return lst
+    return BOARD.view()[2]
+
+def _needs_alert(r):
+    return r[IDX["picker_remark"]] == "PickerDonotMentioned" and r[IDX["flag"]] != "✅"
+
+class TroubleBoard:
+    """
+    Materialized /troubleshoot state: the four problem buckets and the set
+    of rows needing an attention popup, kept current from the trouble
+    store's change events (so from _sync_trouble, _purge_trouble and
+    update_trouble_remark, and from other workers' writes).  The lists,
+    tags and alerts handed to the template are derived from that once per
+    change, never by re-reading the trouble file.
+    """
+
+    def __init__(self, store):
+        self.store  = store
+        self.lock   = threading.RLock()
+        self._stale = True                 # rebuild from the store before next read
+        self._gen   = 0                    # bumped on every change event
+        self._views = None                 # cached (buckets, tags, alerts)
+        self.buckets, self.alerts = {}, {}
+        self.tags   = OverlapTags()
+        store.listeners.append(self._on_change)
+
+    def _on_change(self, old, new):
+        with self.lock:
+            self._gen  += 1
+            self._views = None
+            if self._stale:
+                return
+            if old is None and new is None:        # store reloaded
+                self._stale = True
+                return
+            if new is None:
+                self._remove(old)
+            else:
+                self._add(new)
+
+    def _add(self, r):
+        code, pb = r[IDX["code"]], r[IDX["problem"]]
+        if pb in self.buckets:
+            self.buckets[pb][code] = r             # update keeps its position
+            self.tags.add(code, pb)
+            if _needs_alert(r):
+                self.alerts[pb].add(code)
+            else:
+                self.alerts[pb].discard(code)
+
+    def _remove(self, r):
+        code, pb = r[IDX["code"]], r[IDX["problem"]]
+        if pb in self.buckets:
+            self.buckets[pb].pop(code, None)
+            self.alerts[pb].discard(code)
+            self.tags.remove(code, pb)
+
+    def _rebuild(self):
+        while self._stale:
+            self._stale = False
+            gen  = self._gen
+            rows = self.store.all()                # not under self.lock: store → board order
+            with self.lock:
+                if gen != self._gen:               # changed meanwhile – go again
+                    self._stale = True
+                    continue
+                self.buckets = {p: {} for p in TROUBLE_PROBLEMS}   # problem → {code: row}
+                self.alerts  = {p: set() for p in TROUBLE_PROBLEMS}
+                self.tags    = OverlapTags(self.buckets)
+                for r in rows:
+                    self._add(r)
+
+    @METRICS.timed
+    def view(self):
+        """(buckets, tags, alerts) exactly as the dashboard used to compute them."""
+        self.store.sync()
+        self._rebuild()
+        with self.lock:
+            if self._views is None:
+                buckets = {p: list(d.values()) for p, d in self.buckets.items()}
+                alerts  = [{"code": c, "bucket": p}
+                           for p, d in self.buckets.items()
+                           for c in d if c in self.alerts[p]]
+                self._views = (buckets, _BoardTags(self, self._gen, buckets), alerts)
+            return self._views
+
+class _BoardTags(Mapping):
+    """
+    The board's tags as of generation *gen*: looked up in the live
+    OverlapTags while nothing has changed, otherwise worked out once from
+    the buckets of that generation, so a page never mixes two states.
+    """
+
+    def __init__(self, board, gen, buckets):
+        self.board, self.gen, self.buckets = board, gen, buckets
+        self._frozen = None
+
+    def _freeze(self):
+        if self._frozen is None:
+            self._frozen = _overlap_tags(self.buckets)
+        return self._frozen
+
+    def __getitem__(self, key):
+        if self._frozen is None:
+            with self.board.lock:                  # the live index changes under it
+                if self.board._gen == self.gen:
+                    return self.board.tags[key]
+        return self._freeze()[key]
+
+    def __iter__(self):
+        return iter(self._freeze())
+
+    def __len__(self):
+        return len(self._freeze())
+
+BOARD = TroubleBoard(TROUBLES)
+
+class StatusIndex:
+    """
+    Per-pick-list status for /unscanned: each code's trouble rows, its
+    (status, remark) from _picklist_status, the codes of each status in
+    sorted order and running totals.  Maintained from the trouble store's
+    change events like TroubleBoard, so a change re-decides one code
+    instead of the page regrouping the whole file.
+    """
+
+    def __init__(self, store):
+        self.store  = store
+        self.lock   = threading.RLock()
+        self._stale = True
+        self._gen   = 0
+        self._views = None                 # cached (solved_rows, todo_rows)
+        self.rows, self.status, self.codes = {}, {}, {}
+        self.totals, self.remarks = Counter(), Counter()
+        store.listeners.append(self._on_change)
+
+    def _on_change(self, old, new):
+        with self.lock:
+            self._gen  += 1
+            self._views = None
+            if self._stale:
+                return
+            if old is None and new is None:        # store reloaded
+                self._stale = True
+                return
+            r    = new if new is not None else old
+            code = r[IDX["code"]]
+            group = self.rows.setdefault(code, {})
+            if new is None:
+                group.pop(r[IDX["problem"]], None)
+            else:
+                group[r[IDX["problem"]]] = r       # update keeps its position
+            self._decide(code)
+
+    def _decide(self, code):
+        prev = self.status.pop(code, None)
+        if prev is not None:
+            codes = self.codes[prev[0]]
+            del codes[bisect_left(codes, code)]
+            self.totals[prev[0]]  -= 1
+            self.remarks[prev[1]] -= 1
+        group = self.rows.get(code)
+        if not group:
+            self.rows.pop(code, None)
+            return
+        status, remark = _picklist_status(list(group.values()))
+        insort(self.codes[status], code)
+        self.status[code] = (status, remark)
+        self.totals[status]  += 1
+        self.remarks[remark] += 1
+
+    def _rebuild(self):
+        while self._stale:
+            self._stale = False
+            gen  = self._gen
+            rows = self.store.all()                # not under self.lock: store → index order
+            with self.lock:
+                if gen != self._gen:
+                    self._stale = True
+                    continue
+                self.rows, self.status = {}, {}
+                self.codes = {"solved": [], "todo": []}
+                self.totals, self.remarks = Counter(), Counter()
+                for r in rows:
+                    self.rows.setdefault(r[IDX["code"]], {})[r[IDX["problem"]]] = r
+                for code in self.rows:
+                    self._decide(code)
+
+    def summary(self):
+        """Pick-lists per status and per remark – O(1), no row is looked at."""
+        self.store.sync()
+        self._rebuild()
+        with self.lock:
+            return {"solved": self.totals["solved"], "todo": self.totals["todo"],
+                    "remarks": {k: n for k, n in self.remarks.items() if n}}
+
+    @METRICS.timed
+    def view(self):
+        """(solved_rows, todo_rows) of (sn, code, carrier, remark), by code."""
+        self.store.sync()
+        self._rebuild()
+        with self.lock:
+            if self._views is None:
+                def table(status):
+                    return [(sn, code, next(iter(self.rows[code].values()))[IDX["carrier"]],
+                             self.status[code][1])
+                            for sn, code in enumerate(self.codes[status], 1)]
+                self._views = (table("solved"), table("todo"))
+            return self._views
+
+STATUS = StatusIndex(TROUBLES)
 
 
 # ──────────────────── ROUTES ─────────────────────
@@ -358,15 +1973,32 @@ def _alert_rows():
 @app.route("/troubleshoot")
 @login_required
 @role_required("admin", "power")
+@cached_page
 def troubleshoot():
-    buckets = _bucket_rows()
-    tags    = _overlap_tags(buckets)
-    alerts  = _alert_rows()
-    return render_template("troubleshoot.html",
-                           buckets=buckets,
-                           tags=tags,
-                           alerts=alerts,
-                           IDX=IDX)
+    buckets, tags, alerts = BOARD.view()
+
+    # SN and overlap tags stay positions in the full blocks, whatever the
+    # page, sort or filter (?carrier= ?problem= ?sort= ?limit= ?offset=)
+    opts    = {**_page_opts(), "after": ""}
+    carrier = request.args.get("carrier", "")
+    problem = request.args.get("problem", "")
+    blocks, start, count, more = {}, opts["offset"], 0, False
+    for pb, rows in buckets.items():
+        if problem and pb != problem:
+            continue
+        numbered = [(sn, r) for sn, r in enumerate(rows, 1)
+                    if not carrier or r[IDX["carrier"]] == carrier]
+        blocks[pb], _, more_pb = _paginate(numbered, opts, row=lambda it: it[1])
+        count, more = max(count, len(blocks[pb])), more or more_pb
+    pager = _pager(opts, start, count, sum(map(len, buckets.values())), more)
+    pager["paged"] = pager["paged"] or bool(carrier)
+
+    return _streamed("troubleshoot.html",
+                     buckets=blocks,
+                     pager=pager,
+                     tags=tags,
+                     alerts=alerts,
+                     IDX=IDX)
 
 
 @app.post("/update_trouble_remark")
@@ -377,11 +2009,12 @@ def update_trouble_remark():
     problem = request.form.get("problem", "")
     
 
-    rows = [_parse(l) for l in rl(TROUBLE_FILE)]
-
-
-    for r in rows:
-        if r[IDX["code"]] == code and r[IDX["problem"]] == problem:
+    # read and write under the store lock: a purge or re-sync by another
+    # worker can't slip in between (and be undone by a stale row)
+    with TROUBLES.batch():
+        r = TROUBLES.get(code, problem)
+        if r is not None:
+            r = list(r)
             r[IDX["result"]] = note or "-"  # blank → "-"
             if not note:
                 r[IDX["flag"]] = "⚠"
@@ -389,23 +2022,14 @@ def update_trouble_remark():
                 r[IDX["flag"]] = "✅"
             else:
                 r[IDX["flag"]] = "❌"
-            break
-
-    of(TROUBLE_FILE, [_to_line(r) for r in rows])
+            TROUBLES.upsert(r)
     return redirect(url_for("troubleshoot"))
 
 # helper to purge troubleshoot rows when deleted from account.html
+@METRICS.timed
 def _purge_trouble(code, problem):
     """Remove only the row that has both this code and this problem."""
-    keep = []
-    for line in rl(TROUBLE_FILE):
-        cols = line.rstrip("\n").split("\t")
-        if len(cols) <= IDX["problem"]:
-            continue                          # malformed line – just keep it
-        if cols[IDX["code"]] == code and cols[IDX["problem"]] == problem:
-            continue                          # ←-- skip (= delete) this exact row
-        keep.append(line)
-    of(TROUBLE_FILE, keep)
+    TROUBLES.delete(code, problem)
 
 # add inside your _delete_row (if not already there):
 #     _purge_trouble(code)
@@ -414,12 +2038,25 @@ def _purge_trouble(code, problem):
 def login():
     if request.method == "POST":
         u, p = request.form["username"], request.form["password"]
-        row  = AUTH_USERS.get(u)
-        if row and check_password_hash(row["password_hash"], p):
+        ip   = request.remote_addr or "-"
+        wait = THROTTLE.retry_after(u, ip)
+        if wait:
+            METRICS.inc("logins_total", result="throttled")
+            wait = int(wait) + 1
+            return (_render("login.html", error=f"❌ Too many attempts – try again in {wait} s"),
+                    429, {"Retry-After": str(wait)})
+        row  = DIRECTORY.user(u)
+        if row and HASHER.check(row["password_hash"], p):
+            THROTTLE.succeeded(u)
+            if HASHER.needs_rehash(row["password_hash"]):
+                DIRECTORY.set_password(u, row["password_hash"], HASHER.hash(p))
+            METRICS.inc("logins_total", result="ok")
             login_user(User(row["username"], row["role"]))
             return redirect(request.args.get("next") or url_for("main_page"))
-        return render_template("login.html", error="❌ Wrong username or password")
-    return render_template("login.html")
+        THROTTLE.failed(u, ip)
+        METRICS.inc("logins_total", result="failed")
+        return _render("login.html", error="❌ Wrong username or password")
+    return _render("login.html")
 
 @app.route("/logout")
 @login_required
@@ -436,81 +2073,996 @@ def create_account():
     if request.method == "POST":
         if request.form.get("action") == "add":
             name = request.form.get("name").strip()
-            pwd  = generate_password_hash(request.form.get("pwd").strip())
+            pwd  = HASHER.hash(request.form.get("pwd").strip())
             if name:
-                with open(USERS_CSV, "a", newline="") as fh:
-                    csv.writer(fh).writerow([name, pwd, "user"])
+                DIRECTORY.add_user(name, pwd, "user")
                 message = f"Account '{name}' created."
         elif request.form.get("action") == "delete":
             name = request.form.get("name")
-            users = [r for r in csv.reader(open(USERS_CSV)) if r[0] != name]
-            with open(USERS_CSV, "w", newline="") as fh:
-                csv.writer(fh).writerows(users)
+            DIRECTORY.delete_user(name)
             message = f"Account '{name}' deleted."
         elif request.form.get("carrier_action") == "add_car":
             cname = request.form.get("carrier_name").strip()
             if cname:
-                with open(CARRIERS_FILE, "a") as fh:
-                    fh.write(cname + "\n")
+                DIRECTORY.add_carrier(cname)
                 message = f"Carrier '{cname}' added."
         elif request.form.get("carrier_action") == "delete_car":
             cname = request.form.get("carrier_name")
-            carriers = [l.strip() for l in open(CARRIERS_FILE) if l.strip() != cname]
-            of(CARRIERS_FILE, carriers)
+            DIRECTORY.delete_carrier(cname)
             message = f"Carrier '{cname}' deleted."
 
-    users    = [r["username"] for r in csv.DictReader(open(USERS_CSV))]
-    carriers = [c for c in rl(CARRIERS_FILE)]
-    return render_template("create_account.html", users=users,
+    users    = DIRECTORY.usernames()
+    carriers = DIRECTORY.carriers()
+    return _render("create_account.html", users=users,
                            carriers=carriers, message=message)
 
 # ───────────────────── report: unscanned codes ───────────────────────
 @app.route("/unscanned")
 @login_required
+@cached_page
 def unscanned():
     """
-    Build two lists:
+    Two lists, straight from the STATUS index:
       solved_rows  – goes to the “Solved”  table
       todo_rows    – goes to the “To Be Troubleshooted” table
 
     Each list item is a tuple (sn, code, carrier, remark)
     """
-    # ---- gather rows from TROUBLE_FILE ---------------------------------
-    troubles = [_parse(l) for l in rl(TROUBLE_FILE)]
-    by_code  = {}
-    for r in troubles:
-        by_code.setdefault(r[IDX["code"]], []).append(r)
-
-    solved_rows, todo_rows = [], []
-    sn_solved = sn_todo = 1
-
-    for code, rows in sorted(by_code.items()):
-        status, remark = _picklist_status(rows)
-        carrier        = rows[0][IDX["carrier"]] if rows else "-"
-        if status == "solved":
-            solved_rows.append( (sn_solved, code, carrier, remark) )
-            sn_solved += 1
-        else:
-            todo_rows.append( (sn_todo, code, carrier, remark) )
-            sn_todo += 1
+    solved_rows, todo_rows = STATUS.view()
 
     # ---- render page ---------------------------------------------------
-    return render_template(
+    return _render(
         "unscanned.html",
         solved_rows = solved_rows,
-        todo_rows   = todo_rows
+        todo_rows   = todo_rows,
+        totals      = STATUS.summary()
     )
+# ──────────────────── archive: solved pick-lists ─────────────────────
+# archive/<YYYY-MM>/<run>.seg   zlib blocks of "code TAB solved_at TAB S|T TAB row" lines,
+#                               sorted by code, a code never split across blocks
+# archive/<YYYY-MM>/<run>.idx   header + (first code, offset, length) per block
+_IDX_HEAD  = struct.Struct("<8sIqq32s")    # magic, blocks, min / max solved_at, last code
+_IDX_ENTRY = struct.Struct("<32sQI")
+_IDX_MAGIC = b"PLARCH01"
+_ARCHIVE_KINDS = {"S": "scanned", "T": "troubleshoot"}
+
+def _akey(code):
+    return code.encode("utf-8")[:32].ljust(32, b"\0")
+
+class _Segment:
+    """One archive segment; its index is mmap'd on first use and never loaded."""
+
+    def __init__(self, base):
+        self.base = base
+        self._mm  = None
+
+    def _open(self):
+        if self._mm is None:
+            with open(self.base + ".idx", "rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.n, self.min_ts, self.max_ts, self.last = _IDX_HEAD.unpack_from(mm)
+            if magic != _IDX_MAGIC:
+                raise ValueError(f"{self.base}.idx: not an archive index")
+            self._mm = mm
+        return self._mm
+
+    def __len__(self):                     # the block keys, as a sequence for bisect
+        self._open()
+        return self.n
+
+    def __getitem__(self, i):
+        off = _IDX_HEAD.size + i * _IDX_ENTRY.size
+        return self._open()[off:off + 32]
+
+    def _block(self, fh, i):
+        _, off, length = _IDX_ENTRY.unpack_from(self._open(), _IDX_HEAD.size + i * _IDX_ENTRY.size)
+        fh.seek(off)
+        lines = _lines(zlib.decompress(fh.read(length)))
+        METRICS.io(read=length, rows=len(lines))
+        return lines
+
+    def lookup(self, code):
+        k = _akey(code)
+        if not len(self) or k < self[0] or k > self.last:
+            return []
+        i = max(bisect_right(self, k) - 1, 0)
+        while i > 0 and self[i] == k:      # a long code's 32-byte prefix may open several blocks
+            i -= 1
+        out = []
+        with open(self.base + ".seg", "rb") as fh:
+            while i < self.n and self[i] <= k:
+                out += [l for l in self._block(fh, i) if l.startswith(code + "\t")]
+                i += 1
+        return out
+
+    def lines(self):
+        with open(self.base + ".seg", "rb") as fh:
+            for i in range(len(self)):
+                yield from self._block(fh, i)
+
+def _write_segment(base, lines):
+    """Write sorted archive *lines* as <base>.seg + <base>.idx (the .idx last)."""
+    blocks, buf, size, first = [], [], 0, None
+    for i, line in enumerate(lines):
+        buf.append(line)
+        size += len(line) + 1
+        code = line.split("\t", 1)[0]
+        nxt  = lines[i + 1].split("\t", 1)[0] if i + 1 < len(lines) else None
+        first = first if first is not None else code
+        if nxt is None or (size >= ARCHIVE_BLOCK_BYTES and nxt != code):
+            blocks.append((first, zlib.compress(("\n".join(buf) + "\n").encode("utf-8"), 6)))
+            buf, size, first = [], 0, None
+    stamps = [int(l.split("\t", 2)[1]) for l in lines]
+    data   = b"".join(z for _, z in blocks)
+    index, off = [], 0
+    for code, z in blocks:
+        index.append(_IDX_ENTRY.pack(_akey(code), off, len(z)))
+        off += len(z)
+    head = _IDX_HEAD.pack(_IDX_MAGIC, len(blocks), min(stamps), max(stamps),
+                          _akey(lines[-1].split("\t", 1)[0]))
+    _write_durable(base + ".seg.tmp", data)
+    _write_durable(base + ".idx.tmp", head + b"".join(index))
+    os.replace(base + ".seg.tmp", base + ".seg")
+    os.replace(base + ".idx.tmp", base + ".idx")
+    METRICS.io(written=len(data) + len(head) + len(index) * _IDX_ENTRY.size)
+
+class Archive:
+    """
+    Solved pick-lists rolled out of the live stores, read lazily: a code
+    lookup bisects each segment's mmap'd index and inflates one block, a
+    date-range report only opens the month partitions it covers.
+    Segments are immutable; new ones are picked up by re-listing the
+    month directories whenever one of them changed.
+    """
+
+    def __init__(self, root):
+        self.root      = root
+        self.lock      = threading.Lock()
+        self._stamp    = None
+        self._segments = []                # (month, _Segment), oldest first
+
+    def segments(self):
+        try:
+            months = sorted(e.name for e in os.scandir(self.root)
+                            if e.is_dir() and len(e.name) == 7)
+        except FileNotFoundError:
+            months = []
+        stamp = [(m, os.stat(os.path.join(self.root, m)).st_mtime_ns) for m in months]
+        with self.lock:
+            if stamp != self._stamp:
+                known = {s.base: s for _, s in self._segments}
+                segs  = []
+                for m in months:
+                    for name in sorted(os.listdir(os.path.join(self.root, m))):
+                        if name.endswith(".idx"):
+                            base = os.path.join(self.root, m, name[:-4])
+                            segs.append((m, known.get(base) or _Segment(base)))
+                self._segments, self._stamp = segs, stamp
+            return list(self._segments)
+
+    @staticmethod
+    def _record(line):
+        code, ts, kind, raw = line.split("\t", 3)
+        return int(ts), _ARCHIVE_KINDS.get(kind, kind), _parse(raw)
+
+    @METRICS.timed
+    def lookup(self, code):
+        """[(solved_at, store, row)] of *code*, oldest segment first."""
+        return [self._record(l) for _, s in self.segments() for l in s.lookup(code)]
+
+    def between(self, start, end):
+        """Yield (solved_at, store, row) solved in [start, end), segment by segment."""
+        lo, hi = time.strftime("%Y-%m", time.localtime(start)), time.strftime("%Y-%m", time.localtime(end))
+        for month, seg in self.segments():
+            if not lo <= month <= hi:
+                continue
+            seg._open()
+            if seg.max_ts < start or seg.min_ts >= end:
+                continue
+            for line in seg.lines():
+                rec = self._record(line)
+                if start <= rec[0] < end:
+                    yield rec
+
+ARCHIVE = Archive(ARCHIVE_DIR)
+
+def _rollover_recover(pending_fp):
+    """Finish (or undo) a rollover that died between writing and deleting."""
+    for base in rl(pending_fp):
+        if os.path.exists(base + ".idx"):          # written: finish the deletes
+            for line in _Segment(base).lines():
+                _, kind, row = Archive._record(line)
+                store = SCANS if kind == "scanned" else TROUBLES
+                key   = (row[IDX["code"]], row[IDX["problem"]])
+                if store.get(*key) == row:
+                    store.delete(*key)
+        else:                                      # never finished: drop the pieces
+            for ext in (".seg", ".seg.tmp", ".idx.tmp"):
+                if os.path.exists(base + ext):
+                    os.remove(base + ext)
+    os.remove(pending_fp)
+
+def _rollover(age_days, dry_run=False):
+    """
+    Move pick-lists solved (every trouble row ✅) for at least *age_days*
+    out of both stores into new archive segments.  Rows carry no times, so
+    each run stamps codes it first sees solved in ``solved_since.txt`` –
+    the age is measured from there (resolution: how often the job runs)
+    and a code that stops being solved starts over.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    since_fp   = os.path.join(ARCHIVE_DIR, "solved_since.txt")
+    pending_fp = os.path.join(ARCHIVE_DIR, "rollover.pending")
+    now        = int(time.time())
+    stats      = {"solved": 0, "due": 0, "scanned": 0, "troubleshoot": 0, "segments": 0}
+    with _flocked(os.path.join(ARCHIVE_DIR, "rollover.lock")):
+        if os.path.exists(pending_fp):
+            _rollover_recover(pending_fp)
+        with ExitStack() as held:
+            if not dry_run:                        # writers wait until the rows are moved
+                held.enter_context(SCANS.batch())
+                held.enter_context(TROUBLES.batch())
+            groups = defaultdict(list)
+            for r in TROUBLES.all():
+                groups[r[IDX["code"]]].append(r)
+            solved = {c for c, rows in groups.items() if _picklist_status(rows)[0] == "solved"}
+            since  = dict(l.split("\t", 1) for l in rl(since_fp) if "\t" in l)
+            since  = {c: int(since.get(c, now)) for c in solved}
+            due    = sorted(c for c, t in since.items() if now - t >= age_days * 86400)
+            stats.update(solved=len(solved), due=len(due))
+            if dry_run:
+                return stats
+
+            scans = defaultdict(list)
+            wanted = set(due)
+            for r in SCANS.all():
+                if r[IDX["code"]] in wanted:
+                    scans[r[IDX["code"]]].append(r)
+            months = defaultdict(list)             # partition by the month it was solved
+            for c in due:
+                month = time.strftime("%Y-%m", time.localtime(since[c]))
+                for kind, rows in (("S", scans[c]), ("T", groups[c])):
+                    months[month] += [f"{c}\t{since[c]}\t{kind}\t{_to_line(r)}" for r in rows]
+            run   = time.strftime("%Y%m%dT%H%M%S", time.localtime(now)) + "-" + secrets.token_hex(4)
+            bases = [os.path.join(ARCHIVE_DIR, m, run) for m in sorted(months)]
+            of(pending_fp, bases)
+            for base, m in zip(bases, sorted(months)):
+                os.makedirs(os.path.dirname(base), exist_ok=True)
+                _write_segment(base, months[m])
+            stats["segments"] = len(bases)
+
+            for c in due:
+                for kind, store, rows in (("scanned", SCANS, scans[c]), ("troubleshoot", TROUBLES, groups[c])):
+                    for r in rows:
+                        store.delete(c, r[IDX["problem"]])
+                    stats[kind] += len(rows)
+                del since[c]
+            of(since_fp, [f"{c}\t{t}" for c, t in sorted(since.items())])
+        if os.path.exists(pending_fp):
+            os.remove(pending_fp)
+    for store in (SCANS, TROUBLES):                # shrink the snapshots now
+        if stats["due"] and hasattr(store, "compact"):
+            store.compact()
+    return stats
+
+@app.cli.command("archive-rollover")
+@click.option("--age-days", type=float, default=ARCHIVE_AFTER_DAYS, show_default=True,
+              help="archive pick-lists solved at least this long")
+@click.option("--dry-run", is_flag=True, help="only count what would move")
+def archive_rollover_cmd(age_days, dry_run):
+    """Move long-solved pick-lists into the compressed archive (run from cron)."""
+    s = _rollover(age_days, dry_run)
+    click.echo(f"{s['solved']} solved, {s['due']} due"
+               + ("" if dry_run else f"; moved {s['scanned']} scanned + {s['troubleshoot']} "
+                                     f"trouble rows into {s['segments']} segment(s)"))
+
+@app.route("/archive/<code>")
+@login_required
+@role_required("admin", "power")
+def archive_lookup(code):
+    """Archived rows of one pick-list, as JSON."""
+    return {"code": code, "rows": [
+        {"solved_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts)),
+         "store": store, "row": dict(zip(COLS, row))}
+        for ts, store, row in ARCHIVE.lookup(code.strip().upper())]}
+
+@app.route("/archive/export")
+@login_required
+@role_required("admin", "power")
+def archive_export():
+    """?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive) → TSV of what was solved then, streamed."""
+    try:
+        start = time.mktime(time.strptime(request.args["from"], "%Y-%m-%d"))
+        end   = time.mktime(time.strptime(request.args["to"], "%Y-%m-%d")) + 86400
+    except (KeyError, ValueError):
+        abort(400)
+    def lines():
+        yield "\t".join(["solved_at", "store"] + COLS) + "\n"
+        for ts, store, row in ARCHIVE.between(start, end):
+            yield "\t".join([time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)), store]
+                             + list(row[:len(COLS)])) + "\n"
+    return Response(lines(), mimetype="text/tab-separated-values",
+                    headers={"Content-Disposition": "attachment; filename=archive.tsv"})
+
+# ──────────────────── reports: aggregates / exports ───────────────────
+@METRICS.timed
+def _aggregate(scans, troubles):
+    """Problem counts and solve rates of the trouble rows, in one DataFrame."""
+    import pandas as pd                    # heavy – only reports need it
+    problems = list(TROUBLE_PROBLEMS)
+    df = pd.DataFrame.from_records([r[:len(COLS)] for r in troubles], columns=COLS)
+    df["solved"] = df["flag"] == "✅"
+
+    def table(col):
+        counts = pd.crosstab(df[col], df["problem"]).reindex(columns=problems, fill_value=0)
+        g      = df.groupby(col)["solved"].agg(["size", "sum"])
+        out    = counts.assign(total=g["size"], solved=g["sum"],
+                               solve_rate=(g["sum"] / g["size"]).round(4))
+        return out.to_dict("index")
+
+    open_ = df.loc[~df["solved"], "problem"].value_counts().reindex(problems, fill_value=0)
+    return {
+        "rows":             {"scanned": len(scans), "troubleshoot": len(df)},
+        "by_carrier":       table("carrier"),
+        "by_user":          table("user"),
+        "by_picker_remark": table("picker_remark"),
+        "open":             {k: int(v) for k, v in open_.items()},
+        "solved":           int(df["solved"].sum()),
+        "solve_rate":       round(float(df["solved"].mean()), 4) if len(df) else None,
+    }
+
+class Reports:
+    """Aggregates for /reports, recomputed only when the data version moves."""
+
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.version = None
+        self.data    = None
+
+    def get(self):
+        version = _data_version()
+        with self.lock:                    # one recompute at a time
+            if version != self.version:
+                self.data    = {**_aggregate(SCANS.all(), TROUBLES.all()),
+                                "picklists": STATUS.summary()}
+                self.version = version
+            return {"version": "-".join(map(str, self.version)), **self.data}
+
+REPORTS = Reports()
+
+_XML_BAD = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+XLSX_MAX_ROWS = 1 << 20                    # rows per sheet (Excel's limit)
+
+class _Sink(io.RawIOBase):
+    """Unseekable file the streamed zip writes into; take() drains it."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def take(self):
+        out, self.chunks = b"".join(self.chunks), []
+        return out
+
+def _csv_stream(header, rows):
+    buf = io.StringIO()
+    w   = csv.writer(buf, lineterminator="\n")
+    w.writerow(header)
+    for r in rows:
+        w.writerow(r)
+        if buf.tell() >= STREAM_CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+def _xlsx_stream(header, rows):
+    """
+    A minimal .xlsx (inline strings, a new sheet every XLSX_MAX_ROWS rows)
+    written straight into the response: the zip goes out entry by entry.
+    """
+    import zipfile
+    from xml.sax.saxutils import escape as xml_escape
+    sink   = _Sink()
+    zf     = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+    cell   = lambda v: f'<c t="inlineStr"><is><t xml:space="preserve">{xml_escape(_XML_BAD.sub("", v))}</t></is></c>'
+    row    = lambda r: "<row>" + "".join(map(cell, r)) + "</row>"
+    sheets, rows, more = 0, iter(rows), True
+    while more:
+        sheets += 1
+        with zf.open(f"xl/worksheets/sheet{sheets}.xml", "w", force_zip64=True) as fh:
+            fh.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                     b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                     b"<sheetData>" + row(header).encode("utf-8"))
+            buf, n = [], 1
+            for r in rows:
+                buf.append(row(r))
+                n += 1
+                if len(buf) >= 500:
+                    fh.write("".join(buf).encode("utf-8"))
+                    buf = []
+                    yield sink.take()
+                if n >= XLSX_MAX_ROWS:
+                    break
+            else:
+                more = False
+            fh.write(("".join(buf) + "</sheetData></worksheet>").encode("utf-8"))
+        yield sink.take()
+    ns  = "http://schemas.openxmlformats.org/"
+    rel = ns + "officeDocument/2006/relationships"
+    zf.writestr("xl/workbook.xml",
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<workbook xmlns="{ns}spreadsheetml/2006/main" xmlns:r="{rel}"><sheets>'
+                + "".join(f'<sheet name="Sheet{i}" sheetId="{i}" r:id="rId{i}"/>'
+                          for i in range(1, sheets + 1))
+                + "</sheets></workbook>")
+    zf.writestr("xl/_rels/workbook.xml.rels",
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<Relationships xmlns="{ns}package/2006/relationships">'
+                + "".join(f'<Relationship Id="rId{i}" Type="{rel}/worksheet" '
+                          f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, sheets + 1))
+                + "</Relationships>")
+    zf.writestr("_rels/.rels",
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<Relationships xmlns="{ns}package/2006/relationships">'
+                f'<Relationship Id="rId1" Type="{rel}/officeDocument" Target="xl/workbook.xml"/>'
+                "</Relationships>")
+    zf.writestr("[Content_Types].xml",
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<Types xmlns="{ns}package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" ContentType='
+                '"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType='
+                          '"application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                          for i in range(1, sheets + 1))
+                + "</Types>")
+    zf.close()
+    yield sink.take()
+
+EXPORT_FORMATS = {
+    "csv":  (_csv_stream, "text/csv; charset=utf-8"),
+    "xlsx": (_xlsx_stream, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+def _export_rows(store, filters):
+    """Rows of *store* whose columns equal *filters* (user case-insensitive)."""
+    user = filters.pop("user", None)
+    rows = store.for_user(user) if user is not None else store.all()
+    for r in rows:
+        if all(r[IDX[c]] == v for c, v in filters.items()):
+            yield r[:len(COLS)]
+
+@app.route("/reports")
+@login_required
+@role_required("admin", "power")
+def reports():
+    """Per-carrier / per-user / per-picker_remark problem counts and solve rates (JSON)."""
+    return REPORTS.get()
+
+@app.route("/reports/export")
+@login_required
+@role_required("admin", "power")
+def reports_export():
+    """
+    Raw rows as CSV or XLSX, streamed:  ?format=csv|xlsx
+    &store=troubleshoot|scanned, and any COLS column as an exact filter,
+    e.g. ?carrier=UPS&problem=Missing&user=bob.
+    """
+    fmt, store = request.args.get("format", "csv"), request.args.get("store", "troubleshoot")
+    if fmt not in EXPORT_FORMATS or store not in ("troubleshoot", "scanned"):
+        abort(400)
+    filters = {c: request.args[c] for c in COLS if c in request.args}
+    write, mimetype = EXPORT_FORMATS[fmt]
+    rows = _export_rows(TROUBLES if store == "troubleshoot" else SCANS, filters)
+    return Response(write(COLS, rows), mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={store}.{fmt}"})
+
+# ───────────────────── instrumentation: /metrics ──────────────────────
+PROFILE_SKIP = {"events", "static"}       # long-lived or trivial
+
+@app.before_request
+def _start_request():
+    METRICS.local.tally = [0, 0, 0]
+    g.t0      = time.perf_counter()
+    g.profile = (PROFILER.start() if PROFILE_SLOW_MS and request.endpoint not in PROFILE_SKIP
+                 else None)
+
+@app.after_request
+def _count_request(resp):
+    METRICS.inc("requests_total", endpoint=request.endpoint or "-",
+                method=request.method, status=str(resp.status_code))
+    return resp
+
+@app.teardown_request
+def _finish_request(exc):
+    """Runs once the body is out – after the last chunk of a streamed page."""
+    if "t0" not in g:
+        return
+    endpoint = request.endpoint or "-"
+    seconds  = time.perf_counter() - g.t0
+    read, written, rows = METRICS.local.tally
+    METRICS.local.tally = None
+    METRICS.observe("request_seconds", seconds, endpoint=endpoint)
+    METRICS.observe("request_bytes_read", read, endpoint=endpoint)
+    METRICS.observe("request_bytes_written", written, endpoint=endpoint)
+    METRICS.observe("request_rows_parsed", rows, endpoint=endpoint)
+    if g.profile is not None:
+        stacks = PROFILER.stop(g.profile)
+        if stacks and seconds * 1000 >= PROFILE_SLOW_MS:
+            PROFILER.dump(stacks, endpoint, seconds * 1000)
+            METRICS.inc("slow_requests_profiled_total", endpoint=endpoint)
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text format; admins, or ``Authorization: Bearer $METRICS_TOKEN``."""
+    auth = request.headers.get("Authorization", "")
+    if not (METRICS_TOKEN and secrets.compare_digest(auth, f"Bearer {METRICS_TOKEN}")):
+        if not current_user.is_authenticated:
+            return login_manager.unauthorized()
+        if current_user.role != "admin":
+            abort(403)
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+# ───────────────────── live updates: /events (SSE) ───────────────────
+class EventHub:
+    """
+    Ring buffer of row-level changes for /events, one per process.
+
+    Every worker publishes what its own stores apply – local writes and
+    journal records replayed from other workers alike – so a client sees
+    the same stream whichever worker it is connected to.  Ids are
+    ``<boot>-<n>``; a Last-Event-ID from another worker or from before the
+    buffer makes the client reload instead.  A forked worker (gunicorn
+    --preload imports app in the master) starts over with a boot of its own.
+    """
+
+    def __init__(self, size=2000):
+        self.size = size
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.boot    = secrets.token_hex(4)
+        self.n       = 0
+        self.events  = deque(maxlen=self.size)   # (n, kind, json, user)
+        self.cond    = threading.Condition()
+        self.waiters = set()                     # (loop, asyncio.Event) of ASGI streams
+
+    def publish(self, kind, data, user=None):
+        with self.cond:
+            self.n += 1
+            self.events.append((self.n, kind, json.dumps(data), user))
+            self.cond.notify_all()
+            for loop, ev in self.waiters:
+                loop.call_soon_threadsafe(ev.set)
+
+    def resume_point(self, last_id):
+        """Event number to continue after, or None if *last_id* can't be resumed."""
+        boot, _, n = (last_id or "").partition("-")
+        with self.cond:
+            if boot != self.boot or not n.isdigit():
+                return None
+            oldest = self.events[0][0] if self.events else self.n + 1
+            return int(n) if oldest - 1 <= int(n) <= self.n else None
+
+    def since(self, n, timeout):
+        """Events after *n*, waiting up to *timeout* seconds for the first one."""
+        with self.cond:
+            if self.n <= n:
+                self.cond.wait(timeout)
+            return [e for e in self.events if e[0] > n]
+
+    async def since_async(self, n, timeout):
+        """since() for the ASGI event loop: waits without holding a thread."""
+        import asyncio                     # only the ASGI server needs it
+        with self.cond:
+            if self.n > n:
+                return [e for e in self.events if e[0] > n]
+            waiter = (asyncio.get_running_loop(), asyncio.Event())
+            self.waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.cond:
+                self.waiters.discard(waiter)
+        with self.cond:
+            return [e for e in self.events if e[0] > n]
+
+HUB = EventHub()
+
+def _row_events(kind, user_col=None):
+    def on_change(old, new):
+        if old is None and new is None:
+            HUB.publish("reload", {})
+            return
+        row = new if new is not None else old
+        HUB.publish(kind, {"op": "put" if new is not None else "del", "row": row},
+                    row[IDX["user"]].lower() if user_col else None)
+    return on_change
+
+SCANS.listeners.append(_row_events("scan", user_col=True))
+TROUBLES.listeners.append(_row_events("trouble"))
+
+def _sse_sync():
+    """Pick up other workers' writes (they reach HUB through the listeners)."""
+    SCANS.sync()
+    TROUBLES.sync()
+    DISMISSED.refresh()
+
+def _sse_resume(last_id, retry=2000):
+    """
+    (event no. to continue after, opening frames) of a new stream.  The
+    opening ``id:`` gives the browser a Last-Event-ID to come back with
+    even if the stream ends before any event.
+    """
+    n = HUB.resume_point(last_id)
+    if n is not None:
+        return n, f"retry: {retry}\nid: {HUB.boot}-{n}\n\n"
+    n = HUB.n
+    return n, (f"retry: {retry}\nid: {HUB.boot}-{n}\n\n"
+               + ("event: reload\ndata: {}\n\n" if last_id else ""))
+
+def _sse_frames(evs, user, role):
+    """Frames this client may see: ?user='s scans, trouble rows as /troubleshoot allows."""
+    def shown(kind, who):
+        if kind == "scan":
+            return who == user
+        return kind != "trouble" or role in ("admin", "power")
+    return "".join(f"id: {HUB.boot}-{i}\nevent: {kind}\ndata: {data}\n\n"
+                   for i, kind, data, who in evs if shown(kind, who))
+
+_SSE_SLOTS = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+@app.route("/events")
+@login_required
+def events():
+    """
+    Server-Sent Events: ``scan`` (rows of ?user=), ``trouble`` (admin
+    and power only) and ``dismissed`` deltas, ``reload`` when a page has
+    to start over.
+
+    Every open stream holds one of the worker's threads, so only
+    SSE_MAX_STREAMS of them stay open; any further client gets a
+    long-poll – what is new, or whatever arrives within SSE_POLL_SECONDS
+    – and the browser reconnects with its Last-Event-ID after
+    SSE_POLL_RETRY_MS.
+    """
+    user    = request.args.get("user", "").lower()
+    role    = current_user.role
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+
+    def stream():
+        held = _SSE_SLOTS.acquire(blocking=False)      # taken once the body starts
+        try:
+            METRICS.inc("sse_connections_total", mode="stream" if held else "poll")
+            seconds, retry = (SSE_MAX_SECONDS, 2000) if held else (SSE_POLL_SECONDS, SSE_POLL_RETRY_MS)
+            n, head  = _sse_resume(last_id, retry)
+            yield head
+            deadline = time.monotonic() + seconds
+            quiet    = 0.0
+            while time.monotonic() < deadline:
+                _sse_sync()
+                evs = HUB.since(n, min(1.0, max(0.0, deadline - time.monotonic())))
+                if not evs:
+                    quiet += 1.0
+                    if quiet >= SSE_PING_SECONDS:
+                        quiet = 0.0
+                        yield ": ping\n\n"
+                    continue
+                quiet, n = 0.0, evs[-1][0]
+                frames   = _sse_frames(evs, user, role)
+                if frames:
+                    yield frames
+                    if not held:                       # long-poll: answered
+                        return
+        finally:
+            if held:
+                _SSE_SLOTS.release()
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ─────────────────────── ASGI serving mode ───────────────────────────
+class AsgiBridge:
+    """
+    ASGI front for the (sync) Flask app:  ``uvicorn app:asgi_app``.
+
+    Every request runs the same views and templates on a pool of
+    ASGI_THREADS threads, so a slow fsync or SQLite lock wait holds one
+    pool thread while the event loop keeps accepting and streaming; a
+    streamed page is pulled chunk by chunk on the pool as well.  /events
+    is served on the loop itself – an open stream costs a coroutine, not
+    a thread – with one shared task per process catching up with the
+    other workers' writes.  (asgiref's WsgiToAsgi would run every request
+    on one thread.)  Lifespan startup runs create_app().
+    """
+
+    def __init__(self, wsgi, threads):
+        self.wsgi    = wsgi
+        self.pool    = ThreadPoolExecutor(threads, thread_name_prefix="asgi")
+        self._syncer = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    await self._run(create_app)
+                    await send({"type": "lifespan.startup.complete"})
+                elif msg["type"] == "lifespan.shutdown":
+                    self.pool.shutdown(wait=False)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        body = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        more = True
+        while more:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                return
+            body.write(msg.get("body", b""))
+            more = msg.get("more_body", False)
+        body.seek(0)
+        environ = self._environ(scope, body)
+        role = None
+        if scope["path"] == "/events" and scope["method"] == "GET":
+            role = await self._run(self._role, environ)
+        if role:
+            await self._events(environ, receive, send, role)
+        else:
+            await self._wsgi(environ, send)
+
+    def _run(self, fn, *args):
+        import asyncio                     # imported by the ASGI server already
+        return asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    @staticmethod
+    def _environ(scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        root   = scope.get("root_path", "")
+        path   = scope["path"][len(root):] if scope["path"].startswith(root) else scope["path"]
+        env    = {
+            "REQUEST_METHOD":  scope["method"],
+            "SCRIPT_NAME":     root.encode("utf-8").decode("latin-1"),
+            "PATH_INFO":       path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING":    scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME":     str(server[0]),
+            "SERVER_PORT":     str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR":     scope["client"][0] if scope.get("client") else "",
+            "wsgi.version":    (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input":      body,
+            "wsgi.errors":     sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once":   False,
+        }
+        for name, value in scope.get("headers", []):
+            name  = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            key   = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else "HTTP_" + name
+            env[key] = env[key] + "," + value if key in env else value
+        return env
+
+    async def _wsgi(self, environ, send):
+        """
+        The WSGI call, every next() and the close() run in one pool task:
+        a streamed page pushes its request context (contextvars) and
+        METRICS.local in the thread that starts it, so it has to finish
+        there.  Chunks reach the loop through a small queue; a full queue
+        holds the producer back, a gone client stops it.
+        """
+        import asyncio
+        loop, chunks, stop = asyncio.get_running_loop(), asyncio.Queue(4), threading.Event()
+        started = []
+        def start_response(status, headers, exc_info=None):
+            started[:] = [int(status.split(" ", 1)[0]),
+                          [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]]
+            return lambda data: None       # write() – unused by Flask
+        def put(item):
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+        def produce():
+            try:
+                it = self.wsgi(environ, start_response)
+                try:
+                    for chunk in it:
+                        if stop.is_set():
+                            break
+                        if chunk:
+                            put(chunk)
+                finally:
+                    if hasattr(it, "close"):
+                        it.close()
+            except Exception as e:
+                put(e)
+            else:
+                put(None)
+
+        task = self._run(produce)
+        try:
+            item = await chunks.get()
+            if isinstance(item, Exception):
+                raise item
+            await send({"type": "http.response.start", "status": started[0], "headers": started[1]})
+            while item is not None:
+                await send({"type": "http.response.body", "body": item, "more_body": True})
+                item = await chunks.get()
+                if isinstance(item, Exception):
+                    raise item
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            stop.set()
+            while not task.done():                 # unblock the producer so it can close
+                getter = asyncio.ensure_future(chunks.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                getter.cancel()
+            await task
+
+    def _role(self, environ):
+        """The session user's role, or None when nobody is logged in."""
+        with self.wsgi.request_context(dict(environ)):
+            return current_user.role if current_user.is_authenticated else None
+
+    async def _sync_forever(self):
+        import asyncio
+        while True:
+            try:
+                await self._run(_sse_sync)
+            except OSError as e:
+                app.logger.warning("event sync failed: %s", e)
+            await asyncio.sleep(1.0)
+
+    async def _events(self, environ, receive, send, role):
+        """The /events view (see events()), on the event loop."""
+        import asyncio
+        if self._syncer is None or self._syncer.done():
+            self._syncer = asyncio.ensure_future(self._sync_forever())
+        args    = parse_qs(environ["QUERY_STRING"])
+        user    = args.get("user", [""])[0].lower()
+        last_id = environ.get("HTTP_LAST_EVENT_ID") or args.get("last_id", [None])[0]
+        METRICS.inc("requests_total", endpoint="events", method="GET", status="200")
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]})
+
+        async def gone():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+        left = asyncio.ensure_future(gone())
+        try:
+            n, head = _sse_resume(last_id)
+            await send({"type": "http.response.body", "body": head.encode(), "more_body": True})
+            deadline, quiet = time.monotonic() + SSE_MAX_SECONDS, 0.0
+            while time.monotonic() < deadline and not left.done():
+                evs = await HUB.since_async(n, 1.0)
+                if not evs:
+                    quiet += 1.0
+                    if quiet >= SSE_PING_SECONDS:
+                        quiet = 0.0
+                        await send({"type": "http.response.body", "body": b": ping\n\n", "more_body": True})
+                    continue
+                quiet, n = 0.0, evs[-1][0]
+                frames   = _sse_frames(evs, user, role)
+                if frames:
+                    await send({"type": "http.response.body", "body": frames.encode(), "more_body": True})
+            if not left.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            left.cancel()
+
+asgi_app = AsgiBridge(app, ASGI_THREADS)
+
 # ───────────────────────────── runner ────────────────────────────────
-# ─── Load Dismissed Alerts ───────────────────────────────────────
+# ─── Dismissed Alerts ────────────────────────────────────────────
+class DismissedAlerts:
+    """
+    In-process set of dismissed (code, problem) pairs backed by the
+    append-only DISMISSED_FILE.  Lookups only stat the file: lines other
+    workers appended are tailed in, a rewritten file (new inode) is
+    re-read.  New dismissals are published as ``dismissed`` events.
+    """
+
+    def __init__(self, fp):
+        self.fp      = fp
+        self.lock_fp = fp + ".lock"
+        self.lock    = threading.RLock()
+        self.pairs   = set()
+        self._stamp  = None                # (ino, size, mtime_ns) last seen
+        self._ino    = None
+        self._off    = 0                   # bytes consumed
+        self._lines  = 0                   # lines in the file
+        self._kept   = 0                   # lines right after the last load/compaction
+
+    @contextmanager
+    def locked(self):
+        """Thread lock + exclusive flock, for appends and rewrites."""
+        with self.lock, _flocked(self.lock_fp):
+            yield
+
+    def refresh(self):
+        """Catch up with the file if it changed since the last look."""
+        try:
+            st = os.stat(self.fp)
+        except FileNotFoundError:
+            st = None
+        stamp = st and (st.st_ino, st.st_size, st.st_mtime_ns)
+        new = []
+        with self.lock:
+            if stamp == self._stamp:
+                return
+            publish = True
+            if st is None or st.st_ino != self._ino or st.st_size < self._off:
+                self.pairs, self._ino, self._off, self._lines = set(), st and st.st_ino, 0, 0
+                publish = False                # first load or compaction
+            if st is not None:
+                with open(self.fp, "rb") as fh:
+                    fh.seek(self._off)
+                    data = fh.read()
+                data = data[:data.rfind(b"\n") + 1]   # never a half-written line
+                self._off += len(data)
+                for line in data.decode("utf-8").splitlines():
+                    if "," in line:
+                        pair = tuple(line.strip().split(","))
+                        self.pairs.add(pair)
+                        new.append(pair)
+                        self._lines += 1
+            if not publish:
+                self._kept = self._lines
+            self._stamp = stamp if st is None or self._off == st.st_size else None
+        if publish:
+            for pair in new:
+                if len(pair) == 2:
+                    HUB.publish("dismissed", {"code": pair[0], "problem": pair[1]})
+
+    def __contains__(self, pair):
+        self.refresh()
+        return pair in self.pairs
+
+    def add(self, code, problem):
+        with self.locked():
+            self.refresh()
+            with open(self.fp, "a", encoding="utf-8") as fh:
+                fh.write(f"{code},{problem}\n")
+            self.refresh()
+            due = self._lines - self._kept >= DISMISSED_COMPACT_EVERY
+        if due:                                # after unlocking: flock isn't re-entrant
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the file without duplicates and without dismissals whose
+        trouble row no longer exists.  Returns the number of lines dropped.
+        """
+        with self.locked():
+            self.refresh()
+            live = {(r[IDX["code"]], r[IDX["problem"]]) for r in TROUBLES.all()}
+            keep = [p for p in self.pairs if p in live]
+            of(self.fp, [",".join(p) for p in keep])
+            dropped = self._lines - len(keep)
+            self.refresh()
+            return dropped
+
+DISMISSED = DismissedAlerts(DISMISSED_FILE)
+
 def load_dismissed_alerts():
-    if not os.path.exists("dismissed_alerts.txt"):
-        return set()
-    with open("dismissed_alerts.txt", "r") as f:
-        return set(tuple(line.strip().split(",")) for line in f if "," in line)
+    DISMISSED.refresh()
+    return set(DISMISSED.pairs)
 
 def dismiss_alert(code, problem):
-    with open("dismissed_alerts.txt", "a") as f:
-        f.write(f"{code},{problem}\n")
+    DISMISSED.add(code, problem)
 
 @app.route("/dismiss_alert", methods=["POST"])
 def dismiss_alert_route():
@@ -525,7 +3077,45 @@ def check_dismissed():
     problem = request.args.get("problem")
     if not code or not problem:
         return "false"
-    dismissed = load_dismissed_alerts()
-    return "true" if (code, problem) in dismissed else "false"
+    return "true" if (code, problem) in DISMISSED else "false"
+
+@app.route("/check_dismissed_batch", methods=["POST"])
+def check_dismissed_batch():
+    """
+    Body: JSON list of ``[code, problem]`` pairs (or ``{"pairs": [...]}``).
+    Answers ``{"dismissed": [true, false, …]}`` in the same order.
+    """
+    body  = request.get_json(silent=True)
+    pairs = body.get("pairs") if isinstance(body, dict) else body
+    if not isinstance(pairs, list):
+        abort(400)
+    DISMISSED.refresh()
+    return {"dismissed": [
+        isinstance(p, (list, tuple)) and len(p) == 2 and tuple(map(str, p)) in DISMISSED.pairs
+        for p in pairs
+    ]}
+
+@app.cli.command("compact-dismissed")
+def compact_dismissed_command():
+    """Drop duplicate dismissals and those whose trouble row is gone."""
+    click.echo(f"dropped {DISMISSED.compact()} dismissal(s)")
+
+# ───────────────────────────── app factory ────────────────────────────
+def create_app(warm=True):
+    """
+    Server entry point:  ``gunicorn --preload 'app:create_app()'``.
+
+    Importing app is cheap (no file read or written, nothing hashed); this
+    seeds missing data files and the session key and, with *warm*, loads
+    the stores and builds the dashboard indexes, so no request pays for it.  With --preload that
+    happens once in the master and the forked workers share the pages.
+    """
+    _bootstrap()
+    if warm:
+        _data_version()
+        BOARD.view()
+        STATUS.view()
+    return app
+
 if __name__ == "__main__":
-   app.run(debug=True)
\ No newline at end of file
+   create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,188 @@
+# bench/asgi.py — sync (gunicorn gthread) vs ASGI (uvicorn app:asgi_app) serving
+# --------------------------------------------------------------------------
+# Serves one synthetic dataset (bench/harness.py) both ways with the same
+# number of worker processes, holds --sse /events streams open (a browser
+# tab each), then fires --requests GETs at the page routes from
+# --concurrency clients and reports throughput, tail latency and failures:
+#
+#   python bench/asgi.py --rows 10000 --sse 64 --requests 2000 --concurrency 32
+#
+# The sync server is the Procfile's (gthread, --threads 16): every open
+# stream holds one of a worker's threads, so with more streams than threads
+# page requests queue until a stream ends.  Needs uvicorn for the ASGI run
+# (pip install uvicorn); without it only the sync numbers are reported.
+#
+# Before the load, each server gets --pages sequential GETs of an account
+# page long enough to go out in several chunks (a fresh query string each,
+# so the page cache can't answer).  Every body must arrive whole – 200 and
+# ending in </html> – or the exit status is 1.
+
+import argparse, http.client, importlib.util, json, os, platform, shutil, socket, subprocess
+import sys, threading, time, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "bench"))
+from harness import PASSWORD, ROUTES, USERS, make_dataset   # noqa: E402
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(port, method, path, body=None, cookie=None, timeout=30):
+    con = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        headers = {"Cookie": cookie} if cookie else {}
+        if body is not None:
+            body = urllib.parse.urlencode(body)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        con.request(method, path, body=body, headers=headers)
+        resp = con.getresponse()
+        resp.read()
+        return resp.status, resp.getheader("Set-Cookie")
+    finally:
+        con.close()
+
+
+def _page(port, path, cookie, timeout=30):
+    """(status, body) of one GET, body read to the end."""
+    con = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        con.request("GET", path, headers={"Cookie": cookie})
+        resp = con.getresponse()
+        return resp.status, resp.read()
+    except (OSError, http.client.HTTPException):
+        return None, b""
+    finally:
+        con.close()
+
+
+def _serve(kind, workers, port, cwd, env):
+    if kind == "sync":
+        cmd = [sys.executable, "-m", "gunicorn", "--preload", "--worker-class", "gthread", "--threads", "16",
+               "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:create_app()"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "--workers", str(workers), "--port", str(port),
+               "--log-level", "warning", "--no-access-log", "app:asgi_app"]
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env)
+    for _ in range(600):
+        if proc.poll() is not None:
+            raise SystemExit(f"{kind} server exited during start-up")
+        try:
+            _request(port, "GET", "/login", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise SystemExit(f"{kind} server did not come up")
+
+
+def _hold_stream(port, cookie, stop, opened):
+    """One /events client: connect, read until *stop* is set."""
+    try:
+        con = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        con.request("GET", "/events", headers={"Cookie": cookie})
+        resp = con.getresponse()
+        opened.append(resp.status)
+        while not stop.is_set():
+            try:
+                resp.fp.read1(4096)
+            except (socket.timeout, TimeoutError):
+                pass
+        con.close()
+    except OSError:
+        opened.append(None)
+
+
+def run(kind, args, cwd, env):
+    port = _free_port()
+    proc = _serve(kind, args.workers, port, cwd, env)
+    stop, opened, holders = threading.Event(), [], []
+    try:
+        _, cookie = _request(port, "POST", "/login", {"username": "admin", "password": PASSWORD})
+        cookie = cookie.split(";", 1)[0]
+        pages = [_page(port, f"/account/{USERS[0]}?check={i}", cookie) for i in range(args.pages)]
+        whole = [st == 200 and body.rstrip().endswith(b"</html>") for st, body in pages]
+        for _ in range(args.sse):
+            t = threading.Thread(target=_hold_stream, args=(port, cookie, stop, opened), daemon=True)
+            t.start()
+            holders.append(t)
+        time.sleep(1.0)                                # let the streams settle
+
+        urls = [r.format(user=USERS[0]) for r in ROUTES]
+        def one(i):
+            t = time.perf_counter()
+            try:
+                status, _ = _request(port, "GET", urls[i % len(urls)], cookie=cookie,
+                                     timeout=args.timeout)
+            except OSError:
+                status = None
+            return status, time.perf_counter() - t
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            res = list(pool.map(one, range(args.requests)))
+        wall = time.perf_counter() - t0
+    finally:
+        stop.set()
+        for t in holders:
+            t.join(timeout=5)
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    lat = sorted(s for status, s in res if status == 200)
+    pct = lambda q: round(1000 * lat[min(len(lat) - 1, int(len(lat) * q))], 2) if lat else None
+    return {"server": kind, "streams_open": sum(1 for s in opened if s == 200),
+            "streamed_pages_ok": sum(whole), "streamed_pages_failed": len(whole) - sum(whole),
+            "streamed_page_bytes": max((len(b) for _, b in pages), default=0),
+            "ok": len(lat), "failed": len(res) - len(lat),
+            "req_per_s": round(len(lat) / wall, 2),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "max_ms": pct(1.0)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--workers", type=int, default=2, help="worker processes, both servers")
+    ap.add_argument("--sse", type=int, default=64, help="/events streams held open")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--timeout", type=float, default=30, help="per request, seconds")
+    ap.add_argument("--pages", type=int, default=5, help="streamed-page checks per server")
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    args = ap.parse_args()
+
+    kinds = ["sync"]
+    if importlib.util.find_spec("uvicorn"):
+        kinds.append("asgi")
+    else:
+        print("uvicorn is not installed – reporting the sync server only", file=sys.stderr)
+    tmp = make_dataset(args.rows)
+    env = {**os.environ, "PYTHONPATH": REPO, "PASSWORD_HASH": "pbkdf2:sha256:1",
+           "SSE_MAX_SECONDS": "3600"}
+    results = []
+    try:
+        for kind in kinds:
+            r = run(kind, args, tmp, env)
+            print(f"{kind:<5} {r['req_per_s']:>8} req/s   p50 {r['p50_ms']} ms   p95 {r['p95_ms']} ms   "
+                  f"p99 {r['p99_ms']} ms   failed {r['failed']}   streams {r['streams_open']}   "
+                  f"streamed pages {r['streamed_pages_ok']}/{args.pages} whole",
+                  file=sys.stderr)
+            results.append(r)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    text = json.dumps({"python": platform.python_version(), "rows": args.rows,
+                       "workers": args.workers, "sse": args.sse, "requests": args.requests,
+                       "concurrency": args.concurrency, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if any(r["streamed_pages_failed"] for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# bench/check_overlap_tags.py — property check: OverlapTags == _overlap_tags
+# --------------------------------------------------------------------------
+# Random blocks and random add / update / delete sequences, compared after
+# every step against the reference _overlap_tags on the same blocks:
+#
+#   • OverlapTags built from blocks            (what /account uses)
+#   • OverlapTags kept up to date by add/remove
+#   • the trouble board's tags, driven through _sync_trouble,
+#     _purge_trouble and remark updates on a scratch data directory
+#
+#   python bench/check_overlap_tags.py --runs 200 --seed 1
+#
+# Exit status is 1 on the first mismatch (the failing seed is printed).
+
+import argparse, os, random, shutil, sys, tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+PROBLEMS = ["Missing", "WrongPicked", "TSP", "MoreSkid"]
+
+
+def _row(app, code, problem, remark="-"):
+    row = ["-"] * len(app.COLS)
+    row[app.IDX["code"]], row[app.IDX["problem"]] = code, problem
+    row[app.IDX["carrier"]], row[app.IDX["user"]] = "UPS", "Bench"
+    row[app.IDX["result"]] = remark
+    return row
+
+
+def check_engine(app, rnd, steps):
+    """OverlapTags against _overlap_tags on a model of the blocks."""
+    codes  = [f"C{i:03d}" for i in range(rnd.randint(1, 40))]
+    blocks = {p: {} for p in PROBLEMS}                 # problem → {code: row}
+    for p in PROBLEMS:
+        for c in rnd.sample(codes, rnd.randint(0, len(codes))):
+            blocks[p][c] = _row(app, c, p)
+
+    def lists():
+        return {p: list(d.values()) for p, d in blocks.items()}
+
+    tags = app.OverlapTags(lists())
+    if dict(tags) != app._overlap_tags(lists()):
+        return "built from blocks"
+    for step in range(steps):
+        p, c = rnd.choice(PROBLEMS), rnd.choice(codes)
+        op   = rnd.random()
+        if op < 0.4:                                   # delete
+            blocks[p].pop(c, None)
+            tags.remove(c, p)
+        elif op < 0.6:                                 # update in place
+            if c in blocks[p]:
+                blocks[p][c] = _row(app, c, p, "done")
+                tags.add(c, p)
+        else:                                          # (re)insert at the end
+            blocks[p].pop(c, None)
+            tags.remove(c, p)
+            blocks[p][c] = _row(app, c, p)
+            tags.add(c, p)
+        want = app._overlap_tags(lists())
+        if dict(tags) != want or any(tags.get(k) != v for k, v in want.items()):
+            return f"step {step}"
+    return None
+
+
+def check_board(app, rnd, steps):
+    """The live dashboard's tags against _overlap_tags of its own blocks."""
+    codes = [f"B{i:012d}" for i in range(rnd.randint(1, 30))]
+    prev  = None                                       # last step's (buckets, tags)
+    for step in range(steps):
+        code, problem = rnd.choice(codes), rnd.choice(PROBLEMS)
+        op = rnd.random()
+        if op < 0.3:
+            app._purge_trouble(code, problem)
+        elif op < 0.5 and app.TROUBLES.get(code, problem) is not None:
+            row = list(app.TROUBLES.get(code, problem))
+            row[app.IDX["result"]] = rnd.choice(("done", "nf", "-"))
+            app.TROUBLES.upsert(row)
+        else:
+            app._sync_trouble(_row(app, code, problem))
+        if prev is not None:                           # an older page stays consistent
+            old = app._overlap_tags(prev[0])
+            if any(prev[1].get(k) != v for k, v in old.items()):
+                return f"step {step} (stale view)"
+        buckets, tags, _ = app.BOARD.view()
+        prev = buckets, tags
+        want = app._overlap_tags(buckets)
+        if any(tags.get((r[0], r[8])) != want[r[0], r[8]] for rows in buckets.values() for r in rows):
+            return f"step {step}"
+        if dict(tags) != want:
+            return f"step {step} (iteration)"
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=100)
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="tags-")
+    cwd = os.getcwd()
+    os.chdir(tmp)                                      # the app keeps its data in ./data
+    try:
+        import app
+        app.create_app(warm=False)                     # seeds ./data
+        for run in range(args.runs):
+            seed = args.seed * 100003 + run
+            for name, check in (("engine", check_engine), ("board", check_board)):
+                failed = check(app, random.Random(seed), args.steps)
+                if failed:
+                    print(f"MISMATCH  {name}  seed={seed}  at {failed}")
+                    sys.exit(1)
+        print(f"ok  {args.runs} runs × {args.steps} steps")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
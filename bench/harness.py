@@ -0,0 +1,265 @@
+# bench/harness.py — data-layer / route benchmarks on synthetic datasets
+# --------------------------------------------------------------------------
+# Generates scanned.txt / troubleshoot.txt with 1k, 10k, 100k … rows in a
+# scratch directory, loads the app on it in a fresh interpreter per size,
+# then times
+#
+#   • the helpers   _save_row, _delete_row, _sync_trouble,
+#                   _overlap_tags, _picklist_status
+#   • the routes    /account/<name>, /troubleshoot, /unscanned
+#                   through Flask's test client, single-threaded and from
+#                   --threads concurrent clients, with the page cache off
+#   • cached        the same routes repeated with the page cache on, plain
+#                   and as a conditional GET (If-None-Match → 304)
+#
+# and writes everything as JSON, so two commits can be compared:
+#
+#   python bench/harness.py --sizes 1000,10000,100000 --out before.json
+#   python bench/harness.py --sizes 1000,10000,100000 --out after.json
+#   python bench/harness.py --compare before.json after.json
+#
+# 1M rows (--sizes 1000000) needs a couple of GB of memory.  Datasets are
+# seeded, so every run of one size sees the same rows.  --engine sqlite
+# imports the dataset into SQLite first and benchmarks that store.
+
+import argparse, json, os, platform, random, shutil, subprocess, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "bench"
+USERS    = [f"user{i:02d}" for i in range(50)]
+CARRIERS = ["Default", "UPS", "FedEx", "DHL", "CanadaPost"]
+PROBLEMS = ["Missing", "WrongPicked", "TSP", "MoreSkid", "NoProblem"]
+FLAGS    = ["⚠", "✅", "❌", "Δ"]
+ROUTES   = ["/account/{user}", "/troubleshoot", "/unscanned"]
+
+
+# ───────────────────────────── dataset ────────────────────────────────
+def make_dataset(rows, seed=0):
+    """Scratch directory with a data/ tree of *rows* scanned rows."""
+    from werkzeug.security import generate_password_hash
+    rnd  = random.Random(seed)
+    tmp  = tempfile.mkdtemp(prefix=f"bench-{rows}-")
+    data = os.path.join(tmp, "data")
+    os.makedirs(data)
+    with open(os.path.join(data, "users.csv"), "w") as fh:
+        fh.write("username,password_hash,role\n"
+                 f"admin,{generate_password_hash(PASSWORD, method='pbkdf2:sha256:1')},admin\n")
+    with open(os.path.join(data, "carriers.txt"), "w") as fh:
+        fh.write("\n".join(CARRIERS) + "\n")
+
+    with open(os.path.join(data, "scanned.txt"), "w", encoding="utf-8") as scans, \
+         open(os.path.join(data, "troubleshoot.txt"), "w", encoding="utf-8") as troubles:
+        n, i = 0, 0
+        while n < rows:                        # 1–2 problems per pick-list
+            code = f"PL{i:011d}"
+            i   += 1
+            for problem in rnd.sample(PROBLEMS, min(rnd.choice((1, 1, 2)), rows - n)):
+                row = [code, rnd.choice(CARRIERS[1:]), rnd.choice(USERS),
+                       rnd.choice(("PickerMentioned", "PickerDonotMentioned")),
+                       "-", "-", "-", str(rnd.randint(1, 9)), problem, "-", "-"]
+                scans.write("\t".join(row) + "\n")
+                if problem != "NoProblem":
+                    flag      = rnd.choice(FLAGS)
+                    row[9:11] = [{"✅": "done", "❌": "nf"}.get(flag, "-"), flag]
+                    troubles.write("\t".join(row) + "\n")
+                n += 1
+    return tmp
+
+
+# ───────────────────────────── timing ─────────────────────────────────
+def _stats(samples):
+    s = sorted(samples)
+    return {"n": len(s),
+            "mean_ms": round(1000 * sum(s) / len(s), 4),
+            "p50_ms":  round(1000 * s[len(s) // 2], 4),
+            "p95_ms":  round(1000 * s[min(len(s) - 1, int(len(s) * 0.95))], 4),
+            "min_ms":  round(1000 * s[0], 4)}
+
+def timed(fn, budget, min_n=3, max_n=10000):
+    """Call *fn* for about *budget* seconds (at least *min_n* times)."""
+    samples  = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_n and (len(samples) < min_n or time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+
+# ─────────────────────── one size, in-process ─────────────────────────
+def run_one(budget, threads):
+    """Benchmark the app in the current directory; returns a result dict."""
+    t0 = time.perf_counter()
+    import app as appmod
+    import_s = time.perf_counter() - t0
+    from app import IDX, SCANS, TROUBLES, TROUBLE_PROBLEMS
+
+    def client():
+        c = appmod.app.test_client()
+        c.post("/login", data={"username": "admin", "password": PASSWORD})
+        return c
+
+    scans = SCANS.all()
+    busy  = max(USERS, key=lambda u: len(SCANS.for_user(u)))
+    urls  = [r.format(user=busy) for r in ROUTES]
+    res   = {"rows": len(scans), "trouble_rows": len(TROUBLES.all()),
+             "import_s": round(import_s, 4), "routes": {}, "concurrent": {}, "cached": {},
+             "helpers": {}}
+    budget_bytes, appmod.PAGES.budget = appmod.PAGES.budget, 0     # every request renders
+
+    # ── routes, one client ───────────────────────────────────────────
+    c = client()
+    for url in urls:
+        assert c.get(url).status_code == 200, url
+        res["routes"][url] = timed(lambda: c.get(url).get_data(), budget)
+
+    # ── routes, concurrent clients ───────────────────────────────────
+    clients = [client() for _ in range(threads)]
+    for url in urls:
+        def worker(cl, url=url):
+            lat, end = [], time.perf_counter() + budget
+            while time.perf_counter() < end or not lat:
+                t = time.perf_counter()
+                cl.get(url).get_data()
+                lat.append(time.perf_counter() - t)
+            return lat
+        t = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            lat = [x for part in pool.map(worker, clients) for x in part]
+        wall = time.perf_counter() - t
+        res["concurrent"][url] = {**_stats(lat), "threads": threads,
+                                  "req_per_s": round(len(lat) / wall, 2)}
+
+    # ── routes, page cache on ────────────────────────────────────────
+    appmod.PAGES.budget = budget_bytes
+    for url in urls:
+        etag = c.get(url).headers["ETag"]
+        res["cached"][url] = timed(lambda: c.get(url).get_data(), budget)
+        res["cached"][url + " (304)"] = timed(
+            lambda: c.get(url, headers={"If-None-Match": etag}).get_data(), budget)
+
+    # ── helpers (reads first, then the ones that write) ──────────────
+    troubles = TROUBLES.all()
+    buckets  = {p: [r for r in troubles if r[IDX["problem"]] == p] for p in TROUBLE_PROBLEMS}
+    by_code  = {}
+    for r in troubles:
+        by_code.setdefault(r[IDX["code"]], []).append(r)
+    groups = list(by_code.values())
+    h = res["helpers"]
+    h["_overlap_tags"] = timed(lambda: appmod._overlap_tags(buckets), budget)
+    h["_picklist_status (every code)"] = timed(
+        lambda: [appmod._picklist_status(g) for g in groups], budget)
+
+    rnd  = random.Random(1)
+    hits = [r for r in scans if r[IDX["problem"]] in TROUBLE_PROBLEMS]
+    def update():
+        row = list(rnd.choice(scans))
+        row[IDX["comment"]] = f"c{rnd.random():.6f}"
+        appmod._save_row(row)
+    new_codes = iter(f"BN{i:011d}" for i in range(10 ** 9))
+    inserted  = []
+    def insert():
+        row = list(scans[0])
+        row[IDX["code"]] = next(new_codes)
+        appmod._save_row(row)
+        inserted.append(row[IDX["code"]])
+    h["_save_row (update)"] = timed(update, budget)
+    h["_save_row (insert)"] = timed(insert, budget)
+    gone = iter(inserted)
+    h["_delete_row"]        = timed(lambda: appmod._delete_row(next(gone)), budget,
+                                    min_n=1, max_n=len(inserted))
+    h["_sync_trouble"]      = timed(lambda: appmod._sync_trouble(list(rnd.choice(hits))), budget)
+    return res
+
+
+def run_size(rows, args):
+    tmp = make_dataset(rows, args.seed)
+    env = {**os.environ, "PYTHONPATH": REPO, "STORAGE_ENGINE": args.engine,
+           "PASSWORD_HASH": "pbkdf2:sha256:1"}          # no rehash of the cheap bench hash
+    try:
+        if args.engine == "sqlite":
+            subprocess.run([sys.executable, "-m", "flask", "--app", "app", "import-sqlite"],
+                           cwd=tmp, env=env, check=True, stdout=subprocess.DEVNULL)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-one",
+             "--budget", str(args.budget), "--threads", str(args.threads)],
+            cwd=tmp, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(out.splitlines()[-1])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# ───────────────────────────── compare ────────────────────────────────
+def compare(old_fp, new_fp, threshold):
+    """Print new/old mean ratios; True if anything got slower than *threshold*."""
+    old, new = (json.load(open(fp)) for fp in (old_fp, new_fp))
+    old = {r["rows"]: r for r in old["results"]}
+    bad = False
+    print(f"{'rows':>8}  {'benchmark':<48} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for r in new["results"]:
+        o = old.get(r["rows"])
+        if o is None:
+            continue
+        for group in ("helpers", "routes", "concurrent", "cached"):
+            for name, st in r.get(group, {}).items():
+                if name not in o.get(group, {}):
+                    continue
+                a, b  = o[group][name]["mean_ms"], st["mean_ms"]
+                ratio = b / a if a else float("inf")
+                slow  = ratio > threshold
+                bad  |= slow
+                label = f"{group}:{name}"[:48]
+                print(f"{r['rows']:>8}  {label:<48} {a:>10.3f} {b:>10.3f} {ratio:>6.2f}x"
+                      + ("  SLOWER" if slow else ""))
+    return bad
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000",
+                    help="comma-separated row counts (1000000 for the 1M set)")
+    ap.add_argument("--budget", type=float, default=1.0, help="seconds per benchmark")
+    ap.add_argument("--threads", type=int, default=8, help="concurrent test clients")
+    ap.add_argument("--engine", default="files", choices=("files", "sqlite"))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    ap.add_argument("--threshold", type=float, default=1.25,
+                    help="--compare exits 1 if a mean gets slower than this ratio")
+    ap.add_argument("--run-one", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    if args.run_one:
+        print(json.dumps(run_one(args.budget, args.threads)))
+        return
+
+    results = []
+    for rows in map(int, args.sizes.split(",")):
+        print(f"benchmarking {rows} rows …", file=sys.stderr)
+        results.append(run_size(rows, args))
+    doc = {"commit": _commit(), "python": platform.python_version(),
+           "engine": args.engine, "budget_s": args.budget, "seed": args.seed,
+           "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
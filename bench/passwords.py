@@ -0,0 +1,87 @@
+# bench/passwords.py — cost of the password hash parameters, and login bursts
+# --------------------------------------------------------------------------
+# For every werkzeug method in --methods, times one check_password_hash (what
+# a login costs), then plays a shift-change burst: --logins checks from
+# --threads request threads through app.PasswordHasher, once hashing in the
+# request thread (HASH_WORKERS=0) and once per pool size in --workers.
+# Pick PASSWORD_HASH from the per-check time you can afford:
+#
+#   python bench/passwords.py --methods scrypt:32768:8:1,scrypt:16384:8:1 --out pw.json
+#
+# Rough guide: logins/s per core ≈ 1000 / check_ms.
+
+import argparse, json, os, platform, shutil, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+def check_ms(method, n):
+    from werkzeug.security import check_password_hash, generate_password_hash
+    h  = generate_password_hash("correct horse", method)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        check_password_hash(h, "correct horse")
+    return 1000 * (time.perf_counter() - t0) / n
+
+
+def burst(app, method, workers, logins, threads):
+    """*logins* checks from *threads* threads; returns throughput and latencies."""
+    hasher = app.PasswordHasher(method, workers)
+    h      = hasher.hash("correct horse")            # also starts the pool
+    def one(_):
+        t = time.perf_counter()
+        assert hasher.check(h, "correct horse")
+        return time.perf_counter() - t
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        lat = sorted(pool.map(one, range(logins)))
+    wall = time.perf_counter() - t0
+    if hasher._pool is not None:
+        hasher._pool.shutdown()
+    return {"workers": workers, "logins_per_s": round(logins / wall, 2),
+            "p50_ms": round(1000 * lat[len(lat) // 2], 1),
+            "p95_ms": round(1000 * lat[int(len(lat) * 0.95)], 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--methods", default="scrypt:32768:8:1,scrypt:16384:8:1,pbkdf2:sha256:600000")
+    ap.add_argument("--workers", default=f"1,2,{os.cpu_count() or 1}",
+                    help="pool sizes to try besides 0 (in the request thread)")
+    ap.add_argument("--logins", type=int, default=50)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--repeat", type=int, default=5, help="checks per single-check timing")
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="pw-")
+    cwd = os.getcwd()
+    os.chdir(tmp)                                      # the app keeps its data in ./data
+    try:
+        import app
+        results = []
+        for method in args.methods.split(","):
+            res = {"method": method, "check_ms": round(check_ms(method, args.repeat), 2), "bursts": []}
+            print(f"{method:<24} {res['check_ms']:>8} ms/check", file=sys.stderr)
+            for w in [0] + sorted({int(x) for x in args.workers.split(",")}):
+                b = burst(app, method, w, args.logins, args.threads)
+                print(f"{'':<24} workers={w:<3} {b['logins_per_s']:>7} logins/s   "
+                      f"p50 {b['p50_ms']} ms   p95 {b['p95_ms']} ms", file=sys.stderr)
+                res["bursts"].append(b)
+            results.append(res)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+    text = json.dumps({"python": platform.python_version(), "cpus": os.cpu_count(),
+                       "logins": args.logins, "threads": args.threads, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
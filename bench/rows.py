@@ -0,0 +1,92 @@
+# bench/rows.py — memory and parse time of the row representation
+# --------------------------------------------------------------------------
+# Parses the same synthetic lines with the old representation (a list of
+# fresh strings, right-padded) and with app._parse (interned Row tuples),
+# and reports parse time, traced memory per row, the cost of a full
+# garbage collection with the rows alive and the size of the intern table.
+# A third of the rows carry a free-text troubleshooter note (result), so
+# interning anything unbounded would show up as intern-table growth.
+#
+#   python bench/rows.py --rows 100000,1000000 --out rows.json
+
+import argparse, gc, json, os, random, shutil, sys, tempfile, time, tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+def lines(n, seed=0):
+    rnd   = random.Random(seed)
+    users = [f"user{i:02d}" for i in range(50)]
+    out   = []
+    for i in range(n):
+        flag = rnd.choice(("⚠", "✅", "❌", "Δ"))
+        out.append("\t".join([
+            f"PL{i:011d}", rnd.choice(("UPS", "FedEx", "DHL", "CanadaPost")), rnd.choice(users),
+            rnd.choice(("PickerMentioned", "PickerDonotMentioned")), "-", "-", "-",
+            str(rnd.randint(1, 9)), rnd.choice(("Missing", "WrongPicked", "TSP", "MoreSkid")),
+            {"✅": "done", "❌": "nf"}.get(flag, f"called picker, {rnd.randint(1, 10 ** 6)} left"
+                                           if rnd.random() < 0.33 else "-"), flag,
+        ]))
+    return out
+
+
+def parse_list(raw, _n=11):     # the representation before Row
+    parts = raw.split("\t")
+    parts += ["-"] * (_n - len(parts))
+    return parts
+
+
+def measure(parse, raw):
+    gc.collect()
+    t0   = time.perf_counter()
+    rows = [parse(l) for l in raw]
+    secs = time.perf_counter() - t0
+    del rows
+    gc.collect()
+    tracemalloc.start()
+    rows = [parse(l) for l in raw]
+    mem  = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    gc.collect()
+    gc_s = time.perf_counter() - t0
+    del rows
+    return {"parse_s": round(secs, 4), "us_per_row": round(1e6 * secs / len(raw), 3),
+            "bytes_per_row": round(mem / len(raw), 1), "full_gc_ms": round(1000 * gc_s, 2)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default="100000")
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="rows-")
+    cwd = os.getcwd()
+    os.chdir(tmp)                                      # the app keeps its data in ./data
+    try:
+        import app
+        results = []
+        for n in map(int, args.rows.split(",")):
+            raw = lines(n)
+            app._INTERNED.clear()
+            res = {"rows": n, "list": measure(parse_list, raw), "Row": measure(app._parse, raw),
+                   "interned": len(app._INTERNED)}
+            print(f"{n:>9} rows   list {res['list']['bytes_per_row']:>6} B/row "
+                  f"{res['list']['us_per_row']:>6} µs/row   Row {res['Row']['bytes_per_row']:>6} B/row "
+                  f"{res['Row']['us_per_row']:>6} µs/row   interned {res['interned']}", file=sys.stderr)
+            results.append(res)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+    text = json.dumps({"results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
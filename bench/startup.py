@@ -0,0 +1,153 @@
+# bench/startup.py — import and cold-start time of a worker
+# --------------------------------------------------------------------------
+# Starts a fresh interpreter per sample on a synthetic dataset
+# (bench/harness.py) and times what a gunicorn worker goes through:
+#
+#   • import_ms         import app (must not create, write or open anything
+#                       under the working directory, nor hash anything)
+#   • create_app_ms     create_app(): seed files, load stores, build indexes
+#   • first_request_ms  GET /login, then a logged-in /troubleshoot
+#   • process_ms        the whole child, interpreter start-up included
+#
+# plus one "first boot" run in an empty directory (data files seeded, the
+# default admin hashed with the real PASSWORD_HASH – once per deployment).
+# Medians are compared against the budgets and the exit status is 1 if one
+# is exceeded, so CI can guard start-up time:
+#
+#   python bench/startup.py --sizes 0,10000,100000 --budget-import-ms 400
+#   python bench/startup.py --importtime 15       # slowest imports, to stderr
+
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "bench"))
+from harness import PASSWORD, make_dataset   # noqa: E402
+
+
+def snapshot(top="."):
+    """Every path under *top* with its size and mtime, to spot writes."""
+    out = {}
+    for root, dirs, files in os.walk(top):
+        for name in dirs + files:
+            p = os.path.join(root, name)
+            st = os.lstat(p)
+            out[p] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+def run_one():
+    """In the child: one cold start in the current directory."""
+    before = snapshot()
+    t0 = time.perf_counter()
+    import app as appmod
+    t1 = time.perf_counter()
+    after = snapshot()
+    touched = after != before or appmod._bootstrapped or any(s._loaded for s in appmod.STORES)
+    appmod.create_app()
+    t2 = time.perf_counter()
+    c = appmod.app.test_client()
+    assert c.get("/login").status_code == 200
+    c.post("/login", data={"username": "admin", "password": PASSWORD})
+    c.get("/troubleshoot")
+    t3 = time.perf_counter()
+    return {"import_ms": 1000 * (t1 - t0), "create_app_ms": 1000 * (t2 - t1),
+            "first_request_ms": 1000 * (t3 - t2), "import_touched_data": touched}
+
+
+def sample(cwd, env, repeat):
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-one"],
+                             cwd=cwd, env=env, check=True, capture_output=True, text=True).stdout
+        r = json.loads(out.splitlines()[-1])
+        r["process_ms"] = 1000 * (time.perf_counter() - t)
+        runs.append(r)
+    med = lambda k: round(sorted(r[k] for r in runs)[len(runs) // 2], 2)
+    return {"repeat": repeat, **{k: med(k) for k in
+            ("import_ms", "create_app_ms", "first_request_ms", "process_ms")},
+            "import_touched_data": any(r["import_touched_data"] for r in runs)}
+
+
+def importtime(cwd, env, top):
+    """The *top* modules by cumulative import time (python -X importtime)."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                         cwd=cwd, env=env, check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    for us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{us / 1000:>9.1f} ms  {name}", file=sys.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="0,10000,100000", help="comma-separated row counts")
+    ap.add_argument("--repeat", type=int, default=5, help="cold starts per size (median)")
+    ap.add_argument("--budget-import-ms", type=float, default=400)
+    ap.add_argument("--budget-cold-ms", type=float, default=0,
+                    help="import + create_app + first request, per size; 0 = no limit")
+    ap.add_argument("--importtime", type=int, default=0, metavar="N",
+                    help="also print the N slowest imports")
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    ap.add_argument("--run-one", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one()))
+        return
+
+    env = {**os.environ, "PYTHONPATH": REPO}
+    env.pop("SECRET_KEY", None)
+    results, over = [], []
+    for rows in map(int, args.sizes.split(",")):
+        tmp = make_dataset(rows)
+        try:
+            if args.importtime and not results:
+                importtime(tmp, env, args.importtime)
+            r = {"rows": rows, **sample(tmp, {**env, "PASSWORD_HASH": "pbkdf2:sha256:1"}, args.repeat)}
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        cold = r["import_ms"] + r["create_app_ms"] + r["first_request_ms"]
+        print(f"{rows:>9} rows   import {r['import_ms']:>8} ms   create_app {r['create_app_ms']:>8} ms   "
+              f"first request {r['first_request_ms']:>8} ms   process {r['process_ms']:>8} ms",
+              file=sys.stderr)
+        if r["import_ms"] > args.budget_import_ms:
+            over.append(f"{rows} rows: import {r['import_ms']} ms > {args.budget_import_ms} ms")
+        if args.budget_cold_ms and cold > args.budget_cold_ms:
+            over.append(f"{rows} rows: cold start {cold:.2f} ms > {args.budget_cold_ms} ms")
+        if r["import_touched_data"]:
+            over.append(f"{rows} rows: import app read, created or wrote data files")
+        results.append(r)
+
+    tmp = tempfile.mkdtemp(prefix="boot-")             # first deployment: nothing there yet
+    try:
+        first = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-one"],
+                               cwd=tmp, env=env, check=True, capture_output=True, text=True).stdout
+        first = {k: round(v, 2) if isinstance(v, float) else v
+                 for k, v in json.loads(first.splitlines()[-1]).items()}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(f"{'first boot':>14}   import {first['import_ms']:>8} ms   create_app {first['create_app_ms']:>8} ms",
+          file=sys.stderr)
+    if first["import_touched_data"]:
+        over.append("first boot: import app created data files")
+
+    text = json.dumps({"python": platform.python_version(), "repeat": args.repeat,
+                       "budget_import_ms": args.budget_import_ms,
+                       "budget_cold_ms": args.budget_cold_ms or None,
+                       "results": results, "first_boot": first, "over_budget": over}, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for msg in over:
+        print("OVER BUDGET  " + msg, file=sys.stderr)
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# bench/stress.py — concurrent-writer stress test for the data layer
+# --------------------------------------------------------------------------
+# Starts the app the way the Procfile does (--preload, gthread workers,
+# 'app:create_app()') with 1, 2, 4 … workers on a scratch copy of the data
+# directory, fires thousands of concurrent POSTs at /account/<name> and
+# /update_trouble_remark, then reloads the data files from disk and checks
+# that every single write landed.  A quarter of the requests save, delete
+# or re-remark the same few MX… rows at once: afterwards each must have a
+# trouble row exactly when it has a scan, and that trouble row must match
+# the scan (not a stale copy brought back by a remark update).
+#
+#   python bench/stress.py --workers 1,2,4 --requests 2000 --concurrency 32
+#
+# It also reports how throughput scales: the speed-up over the first worker
+# count against the ideal one, min(workers, cores) / min(first, cores).
+# Writers hold the store's flock only to tail, apply and append a record,
+# but every worker replays every other worker's records (replay_us below),
+# so extra workers only pay off with cores to run them – on one core they
+# cost throughput.
+#
+# Exit status is 1 if any update was lost, or if a worker count reaches
+# less than --min-scaling of its ideal speed-up.
+
+import argparse, os, shlex, shutil, socket, subprocess, sys, tempfile, time
+import urllib.parse, urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+PASSWORD = "stress"
+SEEDED   = 500                        # trouble rows that get remark updates
+MIXED    = 50                         # rows saved, deleted and remarked at once
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *a, **kw):
+        return None
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _post(base, path, data, cookie=None):
+    req = urllib.request.Request(
+        base + path, data=urllib.parse.urlencode(data, doseq=True).encode(),
+        headers={"Cookie": cookie} if cookie else {}
+    )
+    try:
+        resp = _opener.open(req, timeout=60)
+    except urllib.error.HTTPError as e:      # 302 surfaces as an "error"
+        resp = e
+    with resp:
+        resp.read()
+        return resp.status, resp.headers
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _scratch_dir():
+    from werkzeug.security import generate_password_hash
+    tmp  = tempfile.mkdtemp(prefix="stress-")
+    data = os.path.join(tmp, "data")
+    os.makedirs(data)
+    with open(os.path.join(data, "users.csv"), "w") as fh:
+        fh.write("username,password_hash,role\n"
+                 f"admin,{generate_password_hash(PASSWORD)},admin\n")
+    with open(os.path.join(data, "carriers.txt"), "w") as fh:
+        fh.write("Default\nUPS\n")
+    mixed = ["\t".join([f"MX{k:011d}", "UPS", "Admin", "PickerMentioned",
+                         "-", "-", "-", "1", "Missing"]) for k in range(MIXED)]
+    with open(os.path.join(data, "scanned.txt"), "w") as fh:
+        fh.writelines(line + "\t-\t-\n" for line in mixed)
+    with open(os.path.join(data, "troubleshoot.txt"), "w") as fh:
+        for i in range(SEEDED):
+            fh.write("\t".join([f"TS{i:011d}", "UPS", "Admin", "PickerMentioned",
+                                "-", "-", "-", "1", "Missing", "-", "⚠"]) + "\n")
+        fh.writelines(line + "\t-\t⚠\n" for line in mixed)
+    return tmp
+
+
+def _procfile_args():
+    """The gunicorn options and app of the Procfile's web process."""
+    with open(os.path.join(REPO, "Procfile"), encoding="utf-8") as fh:
+        web = next(line for line in fh if line.startswith("web:"))
+    args = shlex.split(web[len("web:"):])
+    return args[args.index("gunicorn") + 1:]
+
+
+def _wait_up(base, proc):
+    for _ in range(200):
+        if proc.poll() is not None:
+            raise SystemExit("gunicorn exited during start-up")
+        try:
+            urllib.request.urlopen(base + "/login", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit("gunicorn did not come up")
+
+
+def run(workers, n_requests, concurrency):
+    tmp  = _scratch_dir()
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    *opts, target = _procfile_args()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *opts, "-w", str(workers), "-b", f"127.0.0.1:{port}",
+         "--chdir", tmp, "--pythonpath", REPO, "--log-level", "warning", target],
+    )
+    try:
+        _wait_up(base, proc)
+        status, headers = _post(base, "/login", {"username": "admin", "password": PASSWORD})
+        cookie = headers["Set-Cookie"].split(";", 1)[0]
+
+        def save(code, qty):
+            return _post(base, "/account/admin",
+                         {"picklist": code, "problem": "Missing", "carrier": "UPS",
+                          "picker_remark": "PickerMentioned", "item_qty": qty}, cookie)[0]
+
+        def remark(code, note):
+            return _post(base, "/update_trouble_remark",
+                         {"code": code, "problem": "Missing", "remark": note}, cookie)[0]
+
+        def job(i):
+            k = i // 4 % MIXED
+            if i % 4 == 0:
+                return save(f"ST{i:011d}", "1")
+            if i % 4 == 1:                    # remark updates on the seeded rows
+                return remark(f"TS{i // 4 % SEEDED:011d}", f"r{i}")
+            if i % 4 == 3:                    # … and on the rows saved / deleted below
+                return remark(f"MX{k:011d}", f"m{i}")
+            if i // 4 // MIXED % 2:
+                return save(f"MX{k:011d}", str(i))
+            return _post(base, "/account/admin",
+                         {"delete_items": f"MX{k:011d}||Missing"}, cookie)[0]
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            statuses = list(pool.map(job, range(n_requests)))
+        elapsed = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # ── verify against what is on disk ────────────────────────────────
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        from app import RowStore, SCAN_FILE, TROUBLE_FILE, IDX
+    finally:
+        os.chdir(cwd)
+    scans    = RowStore(os.path.join(tmp, SCAN_FILE))       # stores load lazily:
+    troubles = RowStore(os.path.join(tmp, TROUBLE_FILE))    # absolute paths
+    t0 = time.perf_counter()
+    records = len(open(scans.log_fp, "rb").readlines()) + len(open(troubles.log_fp, "rb").readlines())
+    scans.sync()
+    troubles.sync()
+    replay_us = 1e6 * (time.perf_counter() - t0) / max(records, 1)
+    lost = []
+    for i in range(0, n_requests, 4):
+        if scans.get(f"ST{i:011d}", "Missing") is None:
+            lost.append(f"scan ST{i:011d}")
+        if troubles.get(f"ST{i:011d}", "Missing") is None:
+            lost.append(f"trouble ST{i:011d}")
+    sent = defaultdict(set)                   # remarks sent per seeded row
+    for i in range(1, n_requests, 4):
+        sent[i // 4 % SEEDED].add(f"r{i}")
+    for j, notes in sent.items():
+        # requests for one row race each other and any of them may win,
+        # but the row must end up carrying one of them
+        got = troubles.get(f"TS{j:011d}", "Missing")[IDX["result"]]
+        if got not in notes:
+            lost.append(f"remark TS{j:011d}={got}")
+    result, flag = IDX["result"], IDX["flag"]
+    for k in range(MIXED):
+        scan    = scans.get(f"MX{k:011d}", "Missing")
+        trouble = troubles.get(f"MX{k:011d}", "Missing")
+        if scan is None and trouble is not None:
+            lost.append(f"mixed MX{k:011d}: trouble row outlived its scan")
+        elif scan is not None and trouble is None:
+            lost.append(f"mixed MX{k:011d}: scan without trouble row")
+        elif scan is not None and [v for c, v in enumerate(trouble) if c not in (result, flag)] \
+                != [v for c, v in enumerate(scan) if c not in (result, flag)]:
+            lost.append(f"mixed MX{k:011d}: stale trouble row")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    bad = sum(1 for s in statuses if s != 302)
+    return {"workers": workers, "requests": n_requests, "seconds": round(elapsed, 3),
+            "req_per_s": round(n_requests / elapsed, 1), "non_302": bad, "lost": lost,
+            "replay_us": round(replay_us, 2)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--min-scaling", type=float, default=0.5,
+                    help="least fraction of the ideal speed-up each worker count must reach")
+    args = ap.parse_args()
+
+    cores  = os.cpu_count() or 1
+    failed = False
+    base   = None
+    print(f"{cores} core(s)")
+    for w in map(int, args.workers.split(",")):
+        res  = run(w, args.requests, args.concurrency)
+        base = base or res
+        ideal   = min(w, cores) / min(base["workers"], cores)
+        speedup = res["req_per_s"] / base["req_per_s"]
+        slow    = speedup < args.min_scaling * ideal
+        print(f"workers={res['workers']:<3} {res['req_per_s']:>8} req/s  "
+              f"speed-up {speedup:.2f}x of {ideal:.0f}x  replay {res['replay_us']} µs/record  "
+              f"non-302={res['non_302']}  lost={len(res['lost'])}" + ("  TOO SLOW" if slow else ""))
+        for item in res["lost"][:10]:
+            print("   lost:", item)
+        failed |= bool(res["lost"]) or bool(res["non_302"]) or slow
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()